@@ -15,8 +15,11 @@ import time
 import logging
 import os
 import json
+from itertools import islice
 from sqlalchemy.orm import Session
 
+from ...processors.bulk import load_sections, sections_path
+
 # Import models when available
 try:
     from ...models.database import get_db
@@ -52,6 +55,19 @@ XML_DIR = os.path.join(DATA_DIR, "xml")
 os.makedirs(PROCESSED_DIR, exist_ok=True)
 os.makedirs(XML_DIR, exist_ok=True)
 
+def get_sample_text(processed_data: Dict[str, Any], max_sections: int = 50) -> str:
+    """Get the start of the first non-trivial section of a processed title.
+    Only the first few sections of the title's section shard are read."""
+    sections_file = sections_path(processed_data, PROCESSED_DIR)
+    if not os.path.exists(sections_file):
+        return ""
+    
+    for section in islice(load_sections(sections_file), max_sections):
+        content = section.get("content", "")
+        if len(content) > 10:
+            return content[:500] + "..." if len(content) > 500 else content
+    return ""
+
 @router.get("/titles", response_model=Dict[str, Any])
 async def get_titles(db: Session = Depends(get_db)):
     """Get the current list of titles directly from eCFR API."""
@@ -176,12 +192,8 @@ async def get_title_metrics(title_number: int, db: Session = Depends(get_db)):
                         try:
                             with open(processed_file, 'r', encoding='utf-8') as f:
                                 processed_data = json.load(f)
-                                # Get first section content as sample
-                                sections = processed_data.get("sections", [])
-                                if sections:
-                                    sample_text = sections[0].get("content", "")
-                                    if len(sample_text) > 500:  # Truncate long samples
-                                        sample_text = sample_text[:500] + "..."
+                            # Get first section content as sample
+                            sample_text = get_sample_text(processed_data)
                         except Exception as e:
                             logger.error(f"Error reading processed file for title {title_number}: {str(e)}")
                     
@@ -209,18 +221,11 @@ async def get_title_metrics(title_number: int, db: Session = Depends(get_db)):
                     agencies = processed_data.get("agencies", [])
                     agency_name = agencies[0] if agencies else "Unknown"
                     
-                    # Calculate metrics
-                    sections = processed_data.get("sections", [])
-                    word_count = 0
-                    section_count = len(sections)
-                    sample_text = ""
-                    
-                    for section in sections:
-                        content = section.get("content", "")
-                        if content:
-                            word_count += len(content.split())
-                            if not sample_text and len(content) > 10:
-                                sample_text = content[:500] + "..." if len(content) > 500 else content
+                    # Totals are computed during processing; sections are in the shard
+                    metrics = processed_data.get("metrics", {})
+                    word_count = metrics.get("word_count", 0)
+                    section_count = metrics.get("section_count", 0)
+                    sample_text = get_sample_text(processed_data)
                     
                     avg_sentence_length = round(word_count / max(section_count, 1), 1)
                     
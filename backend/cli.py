@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+
+"""
+Single command-line entry point for the eCFR Analyzer tools.
+
+Usage: ecfr <command> [options]
+
+Only the module behind the requested command is imported.
+"""
+
+import importlib
+import sys
+
+# Command name -> (module, entry function)
+COMMANDS = {
+    'analyzer': ('backend.main', 'main'),
+    'bulk': ('backend.processors.bulk_process', 'main'),
+    'seed': ('backend.processors.bulk_to_db', 'main'),
+    'scrape': ('backend.processors.scraper', 'main'),
+}
+
+def print_usage() -> None:
+    """Print the available commands."""
+    print("usage: ecfr <command> [options]")
+    print()
+    print("commands:")
+    for name, (module_name, _) in COMMANDS.items():
+        print(f"  {name:<10} runs {module_name}")
+    print()
+    print("Run 'ecfr <command> --help' for a command's options.")
+
+def main() -> int:
+    """Dispatch to the requested command's entry point."""
+    if len(sys.argv) < 2 or sys.argv[1] in ('-h', '--help'):
+        print_usage()
+        return 0 if len(sys.argv) >= 2 else 1
+
+    command = sys.argv[1]
+    if command not in COMMANDS:
+        print(f"ecfr: unknown command '{command}'", file=sys.stderr)
+        print_usage()
+        return 1
+
+    # Let the command's own argument parser see only its arguments
+    module_name, func_name = COMMANDS[command]
+    sys.argv = [f"ecfr {command}"] + sys.argv[2:]
+    entry = getattr(importlib.import_module(module_name), func_name)
+    return entry()
+
+if __name__ == '__main__':
+    sys.exit(main())
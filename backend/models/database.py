@@ -1,13 +1,14 @@
 #!/usr/bin/env python3
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from ..utils.config import settings
 import os
 
-# Create database path if it doesn't exist
-os.makedirs(os.path.dirname(settings.DATABASE_URL), exist_ok=True)
+# Create the SQLite database's directory if it doesn't exist
+if settings.DATABASE_URL.startswith('sqlite:///'):
+    os.makedirs(os.path.dirname(settings.DATABASE_URL[len('sqlite:///'):]) or '.', exist_ok=True)
 
 # Create engine
 engine = create_engine(
@@ -15,6 +16,24 @@ engine = create_engine(
     connect_args={"check_same_thread": False}  # For SQLite only
 )
 
+def configure_sqlite(engine) -> None:
+    """Set WAL journaling and I/O pragmas on every new SQLite connection.
+
+    WAL lets readers keep working while a bulk worker writes, and mmap
+    serves page reads without a pread call per page.
+    """
+    @event.listens_for(engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute("PRAGMA mmap_size=268435456")  # 256 MB
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.close()
+
+if engine.dialect.name == 'sqlite':
+    configure_sqlite(engine)
+
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
@@ -1,12 +1,12 @@
 #!/usr/bin/env python3
 
 import pandas as pd
-import numpy as np
 import logging
 import re
 import textstat
 from typing import Dict, List, Any, Optional
-from collections import Counter
+from collections import Counter, defaultdict
+from functools import lru_cache
 
 # Setup logging
 logging.basicConfig(
@@ -15,6 +15,26 @@ logging.basicConfig(
 )
 logger = logging.getLogger('analyzer')
 
+_WORD_RE = re.compile(r'\b\w+\b')
+_SENTENCE_SPLIT_RE = re.compile(r'[.!?]+')
+
+# textstat scorers bound once so calculate_readability skips module lookups
+_fre = textstat.flesch_reading_ease
+_fk = textstat.flesch_kincaid_grade
+_smog = textstat.smog_index
+_dc = textstat.dale_chall_readability_score
+_ts = textstat.text_standard
+
+# How often analyze_regulation_batch reports progress at INFO level
+_PROGRESS_INTERVAL = 1000
+
+@lru_cache(maxsize=4096)
+def _title_num(identifier: str) -> int:
+    """Parse the title number from a 'title-N-...' regulation identifier."""
+    if not identifier.startswith('title-'):
+        return 0
+    return int(identifier[6:].partition('-')[0])
+
 def clean_text(text: str) -> str:
     """Clean text for analysis."""
     if not text:
@@ -40,21 +60,23 @@ def count_words(text: str) -> int:
     clean = clean_text(text)
     
     # Split by whitespace and count
-    words = re.findall(r'\b\w+\b', clean)
+    words = _WORD_RE.findall(clean)
     return len(words)
 
+def _count_clean_sentences(clean: str) -> int:
+    """Count sentences in already-cleaned text."""
+    # Split by sentence terminators
+    sentences = _SENTENCE_SPLIT_RE.split(clean)
+    # Count non-empty sentences
+    return sum(1 for s in sentences if s.strip())
+
 def count_sentences(text: str) -> int:
     """Count sentences in text."""
     if not text:
         return 0
     
     # Clean the text first
-    clean = clean_text(text)
-    
-    # Split by sentence terminators
-    sentences = re.split(r'[.!?]+', clean)
-    # Count non-empty sentences
-    return sum(1 for s in sentences if s.strip())
+    return _count_clean_sentences(clean_text(text))
 
 def count_paragraphs(text: str) -> int:
     """Count paragraphs in text."""
@@ -66,48 +88,40 @@ def count_paragraphs(text: str) -> int:
     # Count non-empty paragraphs
     return sum(1 for p in paragraphs if p.strip())
 
-def calculate_readability(text: str) -> Dict[str, float]:
-    """Calculate readability metrics."""
-    if not text or len(text) < 100:  # Need minimum text length for reliable metrics
-        return {
-            'flesch_reading_ease': 0,
-            'flesch_kincaid_grade': 0,
-            'smog_index': 0,
-            'dale_chall_readability_score': 0,
-            'difficulty_level': 0
-        }
-    
-    clean = clean_text(text)
-    
+def _empty_readability() -> Dict[str, float]:
+    """Readability metrics reported when they cannot be calculated."""
+    return {
+        'flesch_reading_ease': 0,
+        'flesch_kincaid_grade': 0,
+        'smog_index': 0,
+        'dale_chall_readability_score': 0,
+        'difficulty_level': 0
+    }
+
+def _clean_readability(clean: str) -> Dict[str, float]:
+    """Calculate readability metrics for already-cleaned text."""
     # Use textstat library to calculate readability
     try:
         return {
-            'flesch_reading_ease': textstat.flesch_reading_ease(clean),
-            'flesch_kincaid_grade': textstat.flesch_kincaid_grade(clean),
-            'smog_index': textstat.smog_index(clean),
-            'dale_chall_readability_score': textstat.dale_chall_readability_score(clean),
-            'difficulty_level': textstat.text_standard(clean, float_output=True)
+            'flesch_reading_ease': _fre(clean),
+            'flesch_kincaid_grade': _fk(clean),
+            'smog_index': _smog(clean),
+            'dale_chall_readability_score': _dc(clean),
+            'difficulty_level': _ts(clean, float_output=True)
         }
     except Exception as e:
         logger.error(f"Error calculating readability: {e}")
-        return {
-            'flesch_reading_ease': 0,
-            'flesch_kincaid_grade': 0,
-            'smog_index': 0,
-            'dale_chall_readability_score': 0,
-            'difficulty_level': 0
-        }
+        return _empty_readability()
 
-def extract_term_frequencies(text: str, min_length: int = 3, max_terms: int = 100) -> List[Dict[str, Any]]:
-    """Extract term frequencies from text."""
-    if not text:
-        return []
-    
-    clean = clean_text(text)
-    
-    # Tokenize
-    words = re.findall(r'\b\w+\b', clean.lower())
+def calculate_readability(text: str) -> Dict[str, float]:
+    """Calculate readability metrics."""
+    if not text or len(text) < 100:  # Need minimum text length for reliable metrics
+        return _empty_readability()
     
+    return _clean_readability(clean_text(text))
+
+def _count_terms(words: List[str], min_length: int, max_terms: int) -> List[Dict[str, Any]]:
+    """Count the most common lowercased words of at least min_length."""
     # Filter short words
     words = [w for w in words if len(w) >= min_length]
     
@@ -120,20 +134,36 @@ def extract_term_frequencies(text: str, min_length: int = 3, max_terms: int = 10
         for term, freq in counter.most_common(max_terms)
     ]
 
+def extract_term_frequencies(text: str, min_length: int = 3, max_terms: int = 100) -> List[Dict[str, Any]]:
+    """Extract term frequencies from text."""
+    if not text:
+        return []
+    
+    clean = clean_text(text)
+    
+    # Tokenize
+    words = _WORD_RE.findall(clean.lower())
+    
+    return _count_terms(words, min_length, max_terms)
+
 def analyze_text(text: str) -> Dict[str, Any]:
     """Perform comprehensive text analysis."""
     metrics = {}
     
+    # Clean and tokenize once, then share the results with every metric
+    findall = _WORD_RE.findall
+    clean = clean_text(text)
+    words = findall(clean)
+    
     # Basic counts
-    metrics['word_count'] = count_words(text)
-    metrics['sentence_count'] = count_sentences(text)
+    metrics['word_count'] = len(words)
+    metrics['sentence_count'] = _count_clean_sentences(clean)
     metrics['paragraph_count'] = count_paragraphs(text)
     
     # Average lengths
-    if metrics['word_count'] > 0:
+    if words:
         # Average word length
-        words = re.findall(r'\b\w+\b', clean_text(text))
-        metrics['avg_word_length'] = np.mean([len(w) for w in words]) if words else 0
+        metrics['avg_word_length'] = sum(map(len, words)) / len(words)
     else:
         metrics['avg_word_length'] = 0
         
@@ -143,20 +173,36 @@ def analyze_text(text: str) -> Dict[str, Any]:
         metrics['avg_sentence_length'] = 0
     
     # Readability
-    metrics.update(calculate_readability(text))
+    if not text or len(text) < 100:  # Need minimum text length for reliable metrics
+        metrics.update(_empty_readability())
+    else:
+        metrics.update(_clean_readability(clean))
     
     # Term frequencies
-    metrics['term_frequencies'] = extract_term_frequencies(text)
+    metrics['term_frequencies'] = _count_terms(findall(clean.lower()), 3, 100)
     
     return metrics
 
+def _basic_counts(text: str) -> Dict[str, Any]:
+    """Word and sentence counts shared by the aggregate metric functions."""
+    clean = clean_text(text)
+    words = _WORD_RE.findall(clean)
+    
+    return {
+        'words': len(words),
+        'sentences': _count_clean_sentences(clean),
+        'avg_word_length': sum(map(len, words)) / len(words) if words else 0
+    }
+
 def analyze_regulation_batch(regulations: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     """Analyze a batch of regulations and return metrics."""
     results = []
     
-    for reg in regulations:
+    for i, reg in enumerate(regulations, 1):
         reg_id = reg.get('identifier', 'unknown')
-        logger.info(f"Analyzing regulation: {reg_id}")
+        logger.debug("Analyzing regulation: %s", reg_id)
+        if i % _PROGRESS_INTERVAL == 0:
+            logger.info("Analyzing regulation %d of %d", i, len(regulations))
         
         try:
             # Get text content
@@ -164,7 +210,7 @@ def analyze_regulation_batch(regulations: List[Dict[str, Any]]) -> List[Dict[str
             
             # Skip empty regulations
             if not text:
-                logger.warning(f"Regulation {reg_id} has no text content")
+                logger.warning("Regulation %s has no text content", reg_id)
                 continue
                 
             # Analyze the text
@@ -181,7 +227,7 @@ def analyze_regulation_batch(regulations: List[Dict[str, Any]]) -> List[Dict[str
             results.append(result)
             
         except Exception as e:
-            logger.error(f"Error analyzing regulation {reg_id}: {e}")
+            logger.error("Error analyzing regulation %s: %s", reg_id, e)
     
     return results
 
@@ -191,17 +237,40 @@ def get_word_counts(
 ) -> Dict[str, Any]:
     """Calculate word count metrics from regulations or DataFrame."""
     if regulations:
-        # Convert to DataFrame for easier analysis
-        df = pd.DataFrame([
-            {
-                'id': r.get('identifier', ''),
-                'title': r.get('title', ''),
-                'agency': r.get('agency', ''),
-                'title_number': int(r.get('identifier', '').split('-')[1]) if r.get('identifier', '').startswith('title-') else 0,
-                'word_count': count_words(r.get('text_content', ''))
-            }
-            for r in regulations
-        ])
+        # Aggregate directly from the list; no need for a DataFrame round-trip
+        total_word_count = 0
+        agency_totals = defaultdict(int)
+        title_totals = defaultdict(int)
+        
+        for r in regulations:
+            title_number = _title_num(r.get('identifier', ''))
+            word_count = _basic_counts(r.get('text_content', ''))['words']
+            
+            # Like groupby, leave regulations without an agency out of the breakdown
+            agency = r.get('agency', '')
+            if agency is not None:
+                agency_totals[agency] += word_count
+            title_totals[title_number] += word_count
+            total_word_count += word_count
+        
+        return {
+            'total_word_count': total_word_count,
+            'agencies': [
+                {
+                    'id': a.lower().replace(' ', '-'),
+                    'name': a,
+                    'word_count': c
+                }
+                for a, c in sorted(agency_totals.items())
+            ],
+            'titles': [
+                {
+                    'number': t,
+                    'word_count': c
+                }
+                for t, c in sorted(title_totals.items())
+            ]
+        }
     
     if df is None or df.empty:
         return {
@@ -252,24 +321,61 @@ def get_complexity_metrics(
 ) -> Dict[str, Any]:
     """Calculate complexity metrics from regulations or DataFrame."""
     if regulations:
-        # Process each regulation to get metrics
-        metrics_data = []
+        # Accumulate running sums per group instead of building a DataFrame
+        count = 0
+        readability_sum = 0.0
+        sentence_length_sum = 0.0
+        word_length_sum = 0.0
+        agency_scores = defaultdict(lambda: [0.0, 0])
+        title_scores = defaultdict(lambda: [0.0, 0])
+        
         for r in regulations:
             text = r.get('text_content', '')
-            if text:
-                readability = calculate_readability(text)
-                metrics_data.append({
-                    'id': r.get('identifier', ''),
-                    'title': r.get('title', ''),
-                    'agency': r.get('agency', ''),
-                    'title_number': int(r.get('identifier', '').split('-')[1]) if r.get('identifier', '').startswith('title-') else 0,
-                    'readability_score': readability.get('flesch_reading_ease', 0),
-                    'sentence_length': count_words(text) / max(count_sentences(text), 1),
-                    'word_length': np.mean([len(w) for w in re.findall(r'\b\w+\b', clean_text(text))]) if text else 0
-                })
+            if not text:
+                continue
+            
+            title_number = _title_num(r.get('identifier', ''))
+            readability_score = calculate_readability(text).get('flesch_reading_ease', 0)
+            counts = _basic_counts(text)
+            
+            count += 1
+            readability_sum += readability_score
+            sentence_length_sum += counts['words'] / max(counts['sentences'], 1)
+            word_length_sum += counts['avg_word_length']
+            
+            # Like groupby, leave regulations without an agency out of the breakdown
+            agency = r.get('agency', '')
+            if agency is not None:
+                agency_score = agency_scores[agency]
+                agency_score[0] += readability_score
+                agency_score[1] += 1
+            title_score = title_scores[title_number]
+            title_score[0] += readability_score
+            title_score[1] += 1
+        
+        if count:
+            return {
+                'average_readability_score': readability_sum / count,
+                'average_sentence_length': sentence_length_sum / count,
+                'average_word_length': word_length_sum / count,
+                'agencies': [
+                    {
+                        'id': a.lower().replace(' ', '-'),
+                        'name': a,
+                        'readability_score': total / n
+                    }
+                    for a, (total, n) in sorted(agency_scores.items())
+                ],
+                'titles': [
+                    {
+                        'number': t,
+                        'readability_score': total / n
+                    }
+                    for t, (total, n) in sorted(title_scores.items())
+                ]
+            }
         
-        # Convert to DataFrame
-        df = pd.DataFrame(metrics_data)
+        df = None
     
     if df is None or df.empty:
         return {
@@ -3,15 +3,35 @@ Bulk data processing module for downloading and processing eCFR data
 from the GovInfo Bulk Data Repository.
 """
 
-from .downloader import download_title
-from .processor import extract_text_from_xml, generate_summary
-from .pipeline import process_all_titles, display_title_info, display_summary
+import importlib
+
+# Submodules are imported on first attribute access so that light CLI paths
+# don't pay for requests/lxml at startup
+_EXPORTS = {
+    'download_title': '.downloader',
+    'extract_text_from_xml': '.processor',
+    'generate_summary': '.processor',
+    'load_sections': '.info',
+    'sections_path': '.info',
+    'process_all_titles': '.pipeline',
+    'display_title_info': '.info',
+    'display_summary': '.info',
+}
 
 __all__ = [
     'download_title',
     'extract_text_from_xml',
     'generate_summary',
+    'load_sections',
+    'sections_path',
     'process_all_titles',
     'display_title_info',
     'display_summary'
-]
\ No newline at end of file
+]
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -8,6 +8,7 @@ import os
 import time
 import logging
 import requests
+from requests.adapters import HTTPAdapter
 from typing import Tuple
 
 # Setup logging
@@ -21,6 +22,14 @@ HEADERS = {
 MAX_RETRIES = 3
 RETRY_DELAY = 10
 DELAY_BETWEEN_REQUESTS = 3  # Be nice to the server
+DOWNLOAD_CHUNK_SIZE = 1 << 20
+POOL_SIZE = 8  # Concurrent downloads that can share kept-alive connections
+
+# Shared session so repeated downloads reuse connections (and TLS sessions)
+# to govinfo.gov instead of opening a new one per title
+_SESSION = requests.Session()
+_SESSION.headers.update(HEADERS)
+_SESSION.mount("https://", HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE))
 
 # Known title names
 TITLE_NAMES = {
@@ -46,6 +55,7 @@ TITLE_NAMES = {
     48: "Federal Acquisition Regulations System", 49: "Transportation",
     50: "Wildlife and Fisheries"
 }
+TITLE_NUMS = tuple(TITLE_NAMES)
 
 def download_title(title_num: int, output_dir: str, skip_existing: bool = True) -> Tuple[bool, str, int]:
     """Download a specific title's XML data."""
@@ -59,7 +69,7 @@ def download_title(title_num: int, output_dir: str, skip_existing: bool = True)
     if skip_existing and os.path.exists(file_path):
         file_size = os.path.getsize(file_path)
         if file_size > 0:
-            logger.info(f"Title {title_num} already downloaded ({file_size} bytes)")
+            logger.info("Title %d already downloaded (%d bytes)", title_num, file_size)
             return True, file_path, file_size
     
     # Define the URL
@@ -68,35 +78,31 @@ def download_title(title_num: int, output_dir: str, skip_existing: bool = True)
     # Attempt download with retries
     for attempt in range(MAX_RETRIES):
         try:
-            logger.info(f"Downloading title {title_num} (attempt {attempt + 1})")
-            
-            # Create a session for connection pooling
-            session = requests.Session()
-            session.headers.update(HEADERS)
-            
-            response = session.get(url, stream=True, timeout=60)
-            response.raise_for_status()
+            logger.info("Downloading title %d (attempt %d)", title_num, attempt + 1)
             
-            # Save the XML file
-            with open(file_path, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    f.write(chunk)
+            with _SESSION.get(url, stream=True, timeout=60) as response:
+                response.raise_for_status()
+                
+                # Save the XML file
+                with open(file_path, 'wb') as f:
+                    for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                        f.write(chunk)
             
             file_size = os.path.getsize(file_path)
             
-            logger.info(f"Successfully downloaded title {title_num} ({file_size} bytes)")
+            logger.info("Successfully downloaded title %d (%d bytes)", title_num, file_size)
             
             # Be nice to the server
             time.sleep(DELAY_BETWEEN_REQUESTS)
             return True, file_path, file_size
             
         except Exception as e:
-            logger.error(f"Error downloading title {title_num}: {str(e)}")
+            logger.error("Error downloading title %d: %s", title_num, e)
             
             if attempt < MAX_RETRIES - 1:
                 delay = RETRY_DELAY * (2 ** attempt)  # Exponential backoff
-                logger.info(f"Retrying in {delay} seconds...")
+                logger.info("Retrying in %d seconds...", delay)
                 time.sleep(delay)
             else:
-                logger.error(f"Failed to download title {title_num} after {MAX_RETRIES} attempts")
+                logger.error("Failed to download title %d after %d attempts", title_num, MAX_RETRIES)
                 return False, file_path, 0
\ No newline at end of file
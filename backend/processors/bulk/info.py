@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+
+"""
+Read-only access to processed eCFR bulk data: section shards, and the
+title and summary reports shown by the command line tools.
+Imports nothing heavier than orjson so info commands start quickly.
+"""
+
+import os
+from itertools import islice
+
+import orjson
+
+def sections_path(title_data, json_dir):
+    """Return the path of a title's section shard, which lives in json_dir
+    next to the title's JSON."""
+    name = title_data.get("sections_file") or f"title-{title_data['number']}.sections.ndjson"
+    # Older JSON stored the path as written; only the file name is meaningful
+    return os.path.join(json_dir, os.path.basename(name))
+
+def load_sections(sections_file):
+    """Yield the section dicts stored in a title's NDJSON section shard."""
+    with open(sections_file, 'rb') as f:
+        for line in f:
+            yield orjson.loads(line)
+
+def display_title_info(title_num: int, data_dir: str):
+    """Display information about a specific title."""
+    json_dir = os.path.join(data_dir, "processed")
+    json_path = os.path.join(json_dir, f"title-{title_num}.json")
+    
+    if not os.path.exists(json_path):
+        print(f"No processed data found for title {title_num}")
+        return
+    
+    try:
+        with open(json_path, 'rb') as f:
+            title_data = orjson.loads(f.read())
+        
+        print(f"\nTitle {title_num}: {title_data.get('name', '')}")
+        print("=" * 80)
+        print(f"Full name: {title_data.get('full_name', '')}")
+        print(f"Agencies: {', '.join(title_data.get('agencies', []) or ['Unknown'])}")
+        
+        # Dates
+        dates = title_data.get('dates', {})
+        print(f"Latest amended: {dates.get('latest_amended_on') or 'unknown'}")
+        print(f"Latest issue: {dates.get('latest_issue_date') or 'unknown'}")
+        print(f"Up to date as of: {dates.get('up_to_date_as_of') or 'unknown'}")
+        
+        # Metrics
+        metrics = title_data.get('metrics', {})
+        print(f"Word count: {metrics.get('word_count', 0):,}")
+        print(f"Section count: {metrics.get('section_count', 0):,}")
+        print(f"Paragraph count: {metrics.get('paragraph_count', 0):,}")
+        print(f"Chapter count: {metrics.get('chapter_count', 0):,}")
+        
+        # Structure
+        chapters = title_data.get('chapters', [])
+        if chapters:
+            print(f"\nChapters ({len(chapters)}):")
+            for i, chapter in enumerate(chapters[:5]):  # Show first 5 chapters
+                print(f"  {chapter.get('number', '')}: {chapter.get('name', '')}")
+            if len(chapters) > 5:
+                print(f"  ... and {len(chapters) - 5} more")
+        
+        # Sections
+        section_count = metrics.get('section_count', 0)
+        sections_file = sections_path(title_data, json_dir)
+        if section_count and os.path.exists(sections_file):
+            print(f"\nSections ({section_count}):")
+            for section in islice(load_sections(sections_file), 5):  # Show first 5 sections
+                print(f"  {section.get('number', '')}: {section.get('name', '')}")
+                print(f"    Word count: {section.get('word_count', 0):,}")
+            if section_count > 5:
+                print(f"  ... and {section_count - 5} more")
+        
+    except Exception as e:
+        print(f"Error reading title data: {e}")
+
+def display_summary(data_dir: str):
+    """Display summary information about all processed titles."""
+    summary_path = os.path.join(data_dir, "processed", "summary.json")
+    
+    if not os.path.exists(summary_path):
+        print("No summary data found. Process titles first.")
+        return
+    
+    try:
+        with open(summary_path, 'rb') as f:
+            summary = orjson.loads(f.read())
+        
+        print("\neCFR Processing Summary:")
+        print("=" * 80)
+        print(f"Processed {summary.get('total_titles', 0)} titles")
+        
+        # Total metrics
+        metrics = summary.get('total_metrics', {})
+        print(f"Total word count: {metrics.get('word_count', 0):,}")
+        print(f"Total sections: {metrics.get('section_count', 0):,}")
+        print(f"Total paragraphs: {metrics.get('paragraph_count', 0):,}")
+        
+        # Date range information
+        date_ranges = summary.get('date_ranges', {})
+        print("\nDate information:")
+        print(f"  Latest amended: {date_ranges.get('latest_amended') or 'unknown'}")
+        print(f"  Latest issue: {date_ranges.get('latest_issue') or 'unknown'}")
+        
+        # Top agencies
+        agencies = summary.get('agencies', {})
+        if agencies:
+            print("\nTop agencies by number of titles:")
+            agency_counts = sorted(agencies.items(), key=lambda x: x[1], reverse=True)
+            for agency, count in agency_counts[:5]:
+                print(f"  {agency}: {count} titles")
+        
+        # Title word counts
+        titles = summary.get('titles', [])
+        if titles:
+            print("\nTitles by word count (top 10):")
+            titles_by_words = sorted(titles, key=lambda x: x.get('metrics', {}).get('word_count', 0), reverse=True)
+            for title in titles_by_words[:10]:
+                word_count = title.get('metrics', {}).get('word_count', 0)
+                print(f"  Title {title.get('number')}: {title.get('name')} - {word_count:,} words")
+        
+    except Exception as e:
+        print(f"Error reading summary data: {e}")
\ No newline at end of file
@@ -7,105 +7,188 @@ Extracts structured content from XML files.
 
 import os
 import re
-import json
+import sys
 import logging
-import xml.etree.ElementTree as ET
-from datetime import datetime
+from datetime import date, datetime
 from typing import Dict, List, Any, Optional, Tuple
-from collections import defaultdict
+from collections import Counter
+
+import orjson
+from lxml import etree as ET
 
 # Setup logging
 logger = logging.getLogger('bulk_processor')
 
 from .downloader import TITLE_NAMES
 
+# Supported date formats, combined into one alternation so extract_date
+# scans the text once:
+#   ISO format: 2023-01-31
+#   US format with full month name: January 31, 2023
+#   US format with abbreviated month: Jan. 31, 2023
+#   US format with slash or dash: 01/31/2023, 01-31-2023
+_DATE_RE = re.compile(
+    r'(?P<iyear>\d{4})-(?P<imonth>\d{1,2})-(?P<iday>\d{1,2})'
+    r'|(?P<fmonth>January|February|March|April|May|June|July|August|September|October|November|December)'
+    r'\s+(?P<fday>\d{1,2}),?\s+(?P<fyear>\d{4})'
+    r'|(?P<amonth>Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[\.]*'
+    r'\s+(?P<aday>\d{1,2}),?\s+(?P<ayear>\d{4})'
+    r'|(?P<mm>\d{1,2})[/\-](?P<dd>\d{1,2})[/\-](?P<yyyy>\d{4})'
+)
+
+# Every supported format contains a digit; cheap pre-check before _DATE_RE
+_DIGIT_RE = re.compile(r'\d')
+
+# Month number keyed by both full and abbreviated month names
+_MONTH_TO_NUM = {
+    'January': '01', 'February': '02', 'March': '03', 'April': '04',
+    'May': '05', 'June': '06', 'July': '07', 'August': '08',
+    'September': '09', 'October': '10', 'November': '11', 'December': '12',
+    'Jan': '01', 'Feb': '02', 'Mar': '03', 'Apr': '04',
+    'Jun': '06', 'Jul': '07', 'Aug': '08',
+    'Sep': '09', 'Oct': '10', 'Nov': '11', 'Dec': '12'
+}
+
+_TITLE_FILE_RE = re.compile(r'title-(\d+)\.xml')
+
+# Headings up to this length are interned; they repeat heavily across titles
+_INTERN_MAX_LENGTH = 128
+
+# Elements the streaming parser stops on
+_STREAM_TAGS = ('DIV8', 'DIV5', 'AGENCY', 'HEAD', 'TITLE', 'AMDDATE')
+
+# XPath expressions compiled once and reused for every title
+_HEAD_XPATH = ET.XPath("./HEAD")
+_P_XPATH = ET.XPath("./P")
+
+def _element_text(elem):
+    """Return the text of an element and its descendants, without its tail."""
+    return ET.tostring(elem, method='text', encoding='unicode', with_tail=False)
+
+def _first(elements):
+    """Return the first element of an XPath result, or None if it is empty."""
+    return elements[0] if elements else None
+
 def extract_date(text):
     """
     Extract a date from text in various formats.
     Returns ISO format date string (YYYY-MM-DD) or None if no date found.
     """
-    if not text:
+    # Text without any digits (e.g. prose amendment notes) cannot hold a date
+    if not text or not _DIGIT_RE.search(text):
         return None
     
-    # Common date patterns
-    patterns = [
-        # ISO format: 2023-01-31
-        r'(\d{4}-\d{1,2}-\d{1,2})',
-        # US format with full month name: January 31, 2023
-        r'(January|February|March|April|May|June|July|August|September|October|November|December)\s+(\d{1,2}),?\s+(\d{4})',
-        # US format with abbreviated month: Jan. 31, 2023
-        r'(Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[\.]*\s+(\d{1,2}),?\s+(\d{4})',
-        # US format with slash or dash: 01/31/2023, 01-31-2023
-        r'(\d{1,2})[/\-](\d{1,2})[/\-](\d{4})'
-    ]
+    match = _DATE_RE.search(text)
+    if not match:
+        return None
+    
+    if match.group('iyear'):
+        year, month, day = match.group('iyear', 'imonth', 'iday')
+    elif match.group('yyyy'):
+        # MM/DD/YYYY or MM-DD-YYYY format
+        year, month, day = match.group('yyyy', 'mm', 'dd')
+    else:
+        # Convert full or abbreviated month name to number
+        month = _MONTH_TO_NUM[match.group('fmonth') or match.group('amonth')]
+        year = match.group('fyear') or match.group('ayear')
+        day = match.group('fday') or match.group('aday')
+    
+    try:
+        return date(int(year), int(month), int(day)).isoformat()
+    except ValueError:
+        # Matched the pattern but is not a real calendar date
+        return None
+
+def _extract_section(section):
+    """Build the section dict for a DIV8 SECTION element."""
+    section_num = section.get("N", "")
+    section_title = ""
+    
+    # Get section title from HEAD tag
+    head_elem = _first(_HEAD_XPATH(section))
+    if head_elem is not None and head_elem.text:
+        section_title = head_elem.text.strip()
+        if len(section_title) < _INTERN_MAX_LENGTH:
+            section_title = sys.intern(section_title)
     
-    for pattern in patterns:
-        matches = re.search(pattern, text)
-        if matches:
-            groups = matches.groups()
+    # Extract paragraphs
+    paragraphs = []
+    paragraphs_append = paragraphs.append
+    para_index = 0
+    
+    for p in _P_XPATH(section):
+        para_text = _element_text(p).strip()
+        if para_text:
+            para_id = f"p{para_index}"
+            para_index += 1
             
-            if len(groups) == 1:
-                # Already in ISO format
-                return groups[0]
-            elif len(groups) == 3:
-                if groups[0] in ['January', 'February', 'March', 'April', 'May', 'June', 
-                                'July', 'August', 'September', 'October', 'November', 'December']:
-                    # Convert full month name to number
-                    month_names = {
-                        'January': '01', 'February': '02', 'March': '03', 'April': '04',
-                        'May': '05', 'June': '06', 'July': '07', 'August': '08',
-                        'September': '09', 'October': '10', 'November': '11', 'December': '12'
-                    }
-                    month = month_names[groups[0]]
-                    day = groups[1].zfill(2)
-                    year = groups[2]
-                    return f"{year}-{month}-{day}"
-                elif groups[0] in ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 
-                                  'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']:
-                    # Convert abbreviated month to number
-                    month_abbr = {
-                        'Jan': '01', 'Feb': '02', 'Mar': '03', 'Apr': '04',
-                        'May': '05', 'Jun': '06', 'Jul': '07', 'Aug': '08',
-                        'Sep': '09', 'Oct': '10', 'Nov': '11', 'Dec': '12'
-                    }
-                    month = month_abbr[groups[0]]
-                    day = groups[1].zfill(2)
-                    year = groups[2]
-                    return f"{year}-{month}-{day}"
-                else:
-                    # MM/DD/YYYY or MM-DD-YYYY format
-                    month = groups[0].zfill(2)
-                    day = groups[1].zfill(2)
-                    year = groups[2]
-                    return f"{year}-{month}-{day}"
+            paragraphs_append({
+                "identifier": para_id,
+                "content": para_text,
+                "level": 1
+            })
+    
+    # Get the raw text content
+    content = _element_text(section).strip()
     
-    return None
+    # Calculate metrics
+    if content:
+        word_count = len(content.split())
+    else:
+        word_count = 0
+    
+    # Create section info
+    return {
+        "number": section_num,
+        "name": section_title,
+        "full_identifier": section_num,
+        "content": content,
+        "word_count": word_count,
+        "paragraphs": paragraphs
+    }
 
-def extract_text_from_xml(xml_file_path, output_dir):
+def extract_text_from_xml(xml_file_path, output_dir, force=False):
     """
     Extract key information from the XML file for a title.
-    Returns a comprehensive dictionary with the full hierarchy and content.
+    Returns a comprehensive dictionary with the full hierarchy; section
+    content is written one JSON object per line to the file named by its
+    "sections_file" key (see sections_path). The previously written JSON
+    is reused when it is newer than the XML, unless force is set.
     """
     if not os.path.exists(xml_file_path):
-        logger.error(f"File not found: {xml_file_path}")
+        logger.error("File not found: %s", xml_file_path)
         return None, None
     
     # Get title number from filename
     title_num = None
     file_name = os.path.basename(xml_file_path)
-    match = re.match(r'title-(\d+)\.xml', file_name)
+    match = _TITLE_FILE_RE.match(file_name)
     if match:
         title_num = int(match.group(1))
     else:
-        logger.error(f"Could not extract title number from filename: {file_name}")
+        logger.error("Could not extract title number from filename: %s", file_name)
         return None, None
     
+    # Reuse the processed JSON if the XML hasn't changed since it was written
+    output_file = os.path.join(output_dir, f"title-{title_num}.json")
+    sections_file = os.path.join(output_dir, f"title-{title_num}.sections.ndjson")
+    if not force and os.path.exists(output_file) and os.path.exists(sections_file) and \
+            os.stat(output_file).st_mtime >= os.stat(xml_file_path).st_mtime:
+        try:
+            with open(output_file, 'rb') as f:
+                title_data = orjson.loads(f.read())
+            logger.info("Title %d is up to date, using %s", title_num, output_file)
+            return title_data, output_file
+        except Exception as e:
+            logger.warning("Failed to load processed title %d, reprocessing: %s", title_num, e)
+    
+    # Both outputs are written under temporary names and only moved into
+    # place once the whole title has been processed (see below)
+    sections_tmp = f"{sections_file}.tmp"
+    output_tmp = f"{output_file}.tmp"
+    
     try:
-        logger.info(f"Processing XML for title {title_num}")
-        
-        # Parse the XML
-        tree = ET.parse(xml_file_path)
-        root = tree.getroot()
+        logger.info("Processing XML for title %d", title_num)
         
         # Extract content with full hierarchy
         title_data = {
@@ -115,7 +198,9 @@ def extract_text_from_xml(xml_file_path, output_dir):
             "agencies": [],
             "chapters": [],
             "parts": [],
-            "sections": [],
+            # Relative to output_dir so the processed files can be read from
+            # any working directory; resolve it with sections_path
+            "sections_file": os.path.basename(sections_file),
             "metadata": {},
             "dates": {
                 "latest_amended_on": None,
@@ -128,11 +213,100 @@ def extract_text_from_xml(xml_file_path, output_dir):
             "govinfo_url": f"https://www.govinfo.gov/bulkdata/ECFR/title-{title_num}/ECFR-title{title_num}.xml"
         }
         
-        # Find all text tags using namespaces if needed
-        ns = {'': root.tag.split('}')[0].strip('{') if '}' in root.tag else ''}
+        # Stream the document instead of building the full tree. Sections,
+        # parts (DIV5) and agencies are all handled in this single pass, and
+        # each DIV8/DIV5 is released as soon as it has been extracted.
+        title_head = None
+        part_agency = None  # AGENCY-NAME of the first AGENCY in the open DIV5
+        title_elem = None
+        amd_date_elem = None
+        section_count = 0
+        total_word_count = 0
+        total_paragraph_count = 0
         
-        # Try to extract title name
-        title_elem = root.find(".//DIV1/HEAD", ns) or root.find(".//TITLE", ns)
+        # Sections are written to an NDJSON shard as they are extracted rather
+        # than collected in title_data, so only one section is held at a time
+        os.makedirs(output_dir, exist_ok=True)
+        chapters_append = title_data["chapters"].append
+        with open(sections_tmp, 'wb') as sections_fp:
+            # Bound once; these are called for every section in the title
+            write_line = sections_fp.write
+            dumps = orjson.dumps
+            extract_section = _extract_section
+            
+            # Passing the path lets libxml2 read the file itself; huge_tree lifts
+            # its default size limits, which the largest titles exceed.
+            for _, elem in ET.iterparse(xml_file_path, events=('end',), tag=_STREAM_TAGS, huge_tree=True):
+                tag = elem.tag
+                
+                if tag == 'DIV8':
+                    if elem.get("TYPE") != "SECTION":
+                        continue
+                    
+                    section = elem
+                    section_info = extract_section(section)
+                    total_word_count += section_info["word_count"]
+                    total_paragraph_count += len(section_info["paragraphs"])
+                    
+                    # Append to the title's section shard
+                    write_line(dumps(section_info, option=orjson.OPT_APPEND_NEWLINE))
+                    section_count += 1
+                    
+                    # The section's text has been copied out; drop its subtree
+                    section.clear(keep_tail=True)
+                
+                elif tag == 'DIV5':
+                    chapter = elem
+                    chapter_num = chapter.get("N", "")
+                    chapter_name = ""
+                    
+                    # Get chapter title
+                    head_elem = _first(_HEAD_XPATH(chapter))
+                    if head_elem is not None and head_elem.text:
+                        chapter_name = head_elem.text.strip()
+                    
+                    # Create chapter info
+                    chapter_info = {
+                        "number": chapter_num,
+                        "name": chapter_name,
+                        "identifier": chapter_num,
+                        "parts": []
+                    }
+                    
+                    # Extract agency info, recorded when its AGENCY element closed
+                    if part_agency and part_agency not in title_data["agencies"]:
+                        title_data["agencies"].append(part_agency)
+                    part_agency = None
+                    
+                    # Add to title data
+                    chapters_append(chapter_info)
+                    
+                    # Release the finished part and any earlier siblings
+                    chapter.clear(keep_tail=True)
+                    while chapter.getprevious() is not None:
+                        del chapter.getparent()[0]
+                
+                elif tag == 'AGENCY':
+                    if part_agency is None and next(elem.iterancestors('DIV5'), None) is not None:
+                        part_agency = sys.intern(elem.get("AGENCY-NAME", ""))
+                
+                elif tag == 'HEAD':
+                    if title_head is None and elem.getparent().tag == 'DIV1':
+                        title_head = elem
+                
+                elif tag == 'TITLE':
+                    if title_elem is None:
+                        title_elem = elem
+                
+                elif tag == 'AMDDATE':
+                    if amd_date_elem is None:
+                        amd_date_elem = elem
+        
+        # Try to extract title name. A plain-text DIV1 HEAD repeats the title
+        # number ("Title 7—Agriculture"), so it is only used when it has child
+        # markup; otherwise fall back to TITLE and then the known title name.
+        if title_head is not None and len(title_head):
+            title_elem = title_head
         if title_elem is not None and title_elem.text:
             title_name = title_elem.text.strip()
             title_data["name"] = title_name
@@ -144,96 +318,11 @@ def extract_text_from_xml(xml_file_path, output_dir):
                 title_data["full_name"] = f"Title {title_num}: {title_attr}"
         
         # Extract date information from AMDDATE
-        amd_date_elem = root.find(".//AMDDATE", ns)
         if amd_date_elem is not None and amd_date_elem.text:
             date_text = amd_date_elem.text.strip()
             extracted_date = extract_date(date_text)
             if extracted_date:
                 title_data["dates"]["latest_amended_on"] = extracted_date
-                
-        # Extract sections directly from DIV8 elements
-        section_count = 0
-        total_word_count = 0
-        total_paragraph_count = 0
-        
-        for section in root.findall(".//DIV8[@TYPE='SECTION']", ns):
-            section_num = section.get("N", "")
-            section_title = ""
-            
-            # Get section title from HEAD tag
-            head_elem = section.find("./HEAD", ns)
-            if head_elem is not None and head_elem.text:
-                section_title = head_elem.text.strip()
-            
-            # Extract paragraphs
-            paragraphs = []
-            para_index = 0
-            
-            for p in section.findall("./P", ns):
-                para_text = "".join(p.itertext()).strip()
-                if para_text:
-                    para_id = f"p{para_index}"
-                    para_index += 1
-                    
-                    paragraphs.append({
-                        "identifier": para_id,
-                        "content": para_text,
-                        "level": 1
-                    })
-            
-            # Get the raw text content
-            content = "".join(section.itertext()).strip()
-            
-            # Calculate metrics
-            if content:
-                word_count = len(content.split())
-                total_word_count += word_count
-            else:
-                word_count = 0
-            
-            total_paragraph_count += len(paragraphs)
-            
-            # Create section info
-            section_info = {
-                "number": section_num,
-                "name": section_title,
-                "full_identifier": section_num,
-                "content": content,
-                "word_count": word_count,
-                "paragraphs": paragraphs
-            }
-            
-            # Add to title data
-            title_data["sections"].append(section_info)
-            section_count += 1
-        
-        # Extract chapters (DIV5 elements)
-        for chapter in root.findall(".//DIV5", ns):
-            chapter_num = chapter.get("N", "")
-            chapter_name = ""
-            
-            # Get chapter title
-            head_elem = chapter.find("./HEAD", ns)
-            if head_elem is not None and head_elem.text:
-                chapter_name = head_elem.text.strip()
-            
-            # Create chapter info
-            chapter_info = {
-                "number": chapter_num,
-                "name": chapter_name,
-                "identifier": chapter_num,
-                "parts": []
-            }
-            
-            # Extract agency info
-            agency_elem = chapter.find(".//AGENCY", ns)
-            if agency_elem is not None:
-                agency_name = agency_elem.get("AGENCY-NAME", "")
-                if agency_name and agency_name not in title_data["agencies"]:
-                    title_data["agencies"].append(agency_name)
-            
-            # Add to title data
-            title_data["chapters"].append(chapter_info)
         
         # Calculate metrics
         title_data["metrics"] = {
@@ -245,23 +334,42 @@ def extract_text_from_xml(xml_file_path, output_dir):
         }
         
         # Save the processed data
-        os.makedirs(output_dir, exist_ok=True)
-        output_file = os.path.join(output_dir, f"title-{title_num}.json")
+        with open(output_tmp, 'wb') as f:
+            f.write(orjson.dumps(title_data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
         
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(title_data, f, indent=2, ensure_ascii=False)
+        # Publish the pair. The old JSON goes first, so an interruption leaves
+        # no JSON (and the title is reprocessed) rather than an old JSON next
+        # to a new section file; the section file is in place before the new
+        # JSON that describes it.
+        if os.path.exists(output_file):
+            os.unlink(output_file)
+        os.replace(sections_tmp, sections_file)
+        os.replace(output_tmp, output_file)
         
-        logger.info(f"Successfully processed title {title_num} - {title_data['name']}")
-        logger.info(f"  Words: {total_word_count}, Sections: {section_count}, Paragraphs: {total_paragraph_count}")
-        logger.info(f"  Date info: Updated as of {title_data['dates']['latest_amended_on'] or 'unknown'}")
+        logger.info("Successfully processed title %d - %s", title_num, title_data['name'])
+        logger.info("  Words: %d, Sections: %d, Paragraphs: %d", total_word_count, section_count, total_paragraph_count)
+        logger.info("  Date info: Updated as of %s", title_data['dates']['latest_amended_on'] or 'unknown')
         
         return title_data, output_file
         
     except Exception as e:
-        logger.error(f"Error processing XML for title {title_num}: {str(e)}")
+        logger.error("Error processing XML for title %s: %s", title_num, e)
         import traceback
         traceback.print_exc()
         return None, None
+    
+    finally:
+        # Drop whatever a failed run left behind; after success these are gone
+        for tmp_path in (sections_tmp, output_tmp):
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+
+def _iter_dates(results, field):
+    """Yield the non-empty values of a date field across processed titles."""
+    for title_data in results.values():
+        value = title_data.get("dates", {}).get(field)
+        if value:
+            yield value
 
 def generate_summary(results: Dict[int, Dict[str, Any]], output_dir: str):
     """Generate summary data for all processed titles."""
@@ -272,7 +380,7 @@ def generate_summary(results: Dict[int, Dict[str, Any]], output_dir: str):
     summary = {
         "total_titles": len(results),
         "titles": [],
-        "agencies": defaultdict(int),
+        "agencies": {},
         "date_ranges": {
             "earliest_amended": None,
             "latest_amended": None,
@@ -291,6 +399,8 @@ def generate_summary(results: Dict[int, Dict[str, Any]], output_dir: str):
         }
     }
     
+    agency_counts = Counter()
+    
     # Collect data from all titles
     for title_num, title_data in results.items():
         title_summary = {
@@ -304,55 +414,36 @@ def generate_summary(results: Dict[int, Dict[str, Any]], output_dir: str):
         summary["titles"].append(title_summary)
         
         # Add to agency counts
-        for agency in title_data.get("agencies", []):
-            summary["agencies"][agency] += 1
+        agency_counts.update(title_data.get("agencies", []))
         
         # Add to total metrics
         metrics = title_data.get("metrics", {})
         for key, value in metrics.items():
             if key in summary["total_metrics"]:
                 summary["total_metrics"][key] += value
-        
-        # Update date ranges
-        dates = title_data.get("dates", {})
-        
-        # Amended dates
-        amended_date = dates.get("latest_amended_on")
-        if amended_date:
-            if not summary["date_ranges"]["earliest_amended"] or amended_date < summary["date_ranges"]["earliest_amended"]:
-                summary["date_ranges"]["earliest_amended"] = amended_date
-            if not summary["date_ranges"]["latest_amended"] or amended_date > summary["date_ranges"]["latest_amended"]:
-                summary["date_ranges"]["latest_amended"] = amended_date
-        
-        # Issue dates
-        issue_date = dates.get("latest_issue_date")
-        if issue_date:
-            if not summary["date_ranges"]["earliest_issue"] or issue_date < summary["date_ranges"]["earliest_issue"]:
-                summary["date_ranges"]["earliest_issue"] = issue_date
-            if not summary["date_ranges"]["latest_issue"] or issue_date > summary["date_ranges"]["latest_issue"]:
-                summary["date_ranges"]["latest_issue"] = issue_date
-        
-        # Update dates
-        update_date = dates.get("up_to_date_as_of")
-        if update_date:
-            if not summary["date_ranges"]["earliest_update"] or update_date < summary["date_ranges"]["earliest_update"]:
-                summary["date_ranges"]["earliest_update"] = update_date
-            if not summary["date_ranges"]["latest_update"] or update_date > summary["date_ranges"]["latest_update"]:
-                summary["date_ranges"]["latest_update"] = update_date
+    
+    # Update date ranges (ISO date strings order lexicographically)
+    date_ranges = summary["date_ranges"]
+    date_ranges["earliest_amended"] = min(_iter_dates(results, "latest_amended_on"), default=None)
+    date_ranges["latest_amended"] = max(_iter_dates(results, "latest_amended_on"), default=None)
+    date_ranges["earliest_issue"] = min(_iter_dates(results, "latest_issue_date"), default=None)
+    date_ranges["latest_issue"] = max(_iter_dates(results, "latest_issue_date"), default=None)
+    date_ranges["earliest_update"] = min(_iter_dates(results, "up_to_date_as_of"), default=None)
+    date_ranges["latest_update"] = max(_iter_dates(results, "up_to_date_as_of"), default=None)
     
     # Sort titles by number
     summary["titles"].sort(key=lambda x: x["number"])
     
-    # Convert agencies from defaultdict to regular dict
-    summary["agencies"] = dict(summary["agencies"])
+    # Convert agencies from Counter to regular dict
+    summary["agencies"] = dict(agency_counts)
     
     # Save summary to file
     summary_file = os.path.join(output_dir, "summary.json")
-    with open(summary_file, 'w', encoding='utf-8') as f:
-        json.dump(summary, f, indent=2, ensure_ascii=False)
+    with open(summary_file, 'wb') as f:
+        f.write(orjson.dumps(summary, option=orjson.OPT_INDENT_2))
     
-    logger.info(f"Generated summary for {len(results)} titles")
-    logger.info(f"Total word count: {summary['total_metrics']['word_count']:,}")
-    logger.info(f"Date range: {summary['date_ranges'].get('earliest_amended')} to {summary['date_ranges'].get('latest_amended')}")
+    logger.info("Generated summary for %d titles", len(results))
+    logger.info("Total word count: %s", format(summary['total_metrics']['word_count'], ','))
+    logger.info("Date range: %s to %s", summary['date_ranges'].get('earliest_amended'), summary['date_ranges'].get('latest_amended'))
     
     return summary
\ No newline at end of file
@@ -9,13 +9,6 @@ import sys
 import argparse
 import logging
 
-from .bulk import (
-    download_title, 
-    process_all_titles, 
-    display_title_info, 
-    display_summary
-)
-
 # Setup logging
 logging.basicConfig(
     level=logging.INFO,
@@ -27,7 +20,7 @@ def main():
     """Main entry point for the processor."""
     parser = argparse.ArgumentParser(description="Download and process eCFR data from GovInfo bulk XML")
     parser.add_argument("--data-dir", default="./data", help="Base directory for data storage")
-    parser.add_argument("--max-workers", type=int, default=2, help="Maximum number of parallel workers")
+    parser.add_argument("--max-workers", type=int, help="Maximum number of parallel worker processes (default: one per available CPU)")
     parser.add_argument("--title", type=int, help="Process a specific title only")
     parser.add_argument("--titles", type=str, help="Comma-separated list of titles to process")
     parser.add_argument("--force", action="store_true", help="Force download even if files exist")
@@ -47,11 +40,13 @@ def main():
     
     # Info mode
     if args.info:
+        from .bulk.info import display_summary
         display_summary(data_dir)
         return 0
     
     # Show specific title
     if args.show_title:
+        from .bulk.info import display_title_info
         display_title_info(args.show_title, data_dir)
         return 0
     
@@ -68,7 +63,7 @@ def main():
     
     # Download only
     if args.download_only:
-        from .bulk.downloader import TITLE_NAMES
+        from .bulk.downloader import download_title, TITLE_NUMS
         
         if title_nums:
             for title_num in title_nums:
@@ -76,12 +71,15 @@ def main():
                 print(f"Title {title_num}: {'Success' if success else 'Failed'} ({file_size} bytes)")
         else:
             # Download all titles
-            for title_num in TITLE_NAMES.keys():
+            for title_num in TITLE_NUMS:
                 success, file_path, file_size = download_title(title_num, xml_dir, not args.force)
                 print(f"Title {title_num}: {'Success' if success else 'Failed'} ({file_size} bytes)")
         return 0
     
     # Process titles
+    from .bulk.pipeline import process_all_titles
+    from .bulk.info import display_summary
+    
     results = process_all_titles(
         data_dir=data_dir,
         max_workers=args.max_workers,
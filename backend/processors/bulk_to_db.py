@@ -11,16 +11,21 @@ import sys
 import json
 import time
 import logging
+import queue
 import argparse
+import threading
 import requests
+from contextlib import closing
 from datetime import datetime
-from typing import Dict, List, Any, Optional, Tuple
+from functools import lru_cache
+from typing import Dict, Iterable, List, Any, Optional, Tuple
 from concurrent.futures import ThreadPoolExecutor
+from sqlalchemy import insert, text
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
 
 # Import database modules
-from backend.models.database import engine, Base, get_db
+from backend.models.database import engine, Base, SessionLocal
 from backend.models.models import (
     Title, Agency, RegulationMetrics, Chapter, 
     Subchapter, Part, Subpart, Section, Paragraph
@@ -28,9 +33,9 @@ from backend.models.models import (
 
 # Import the bulk processor modules
 from backend.processors.bulk import (
-    download_title, extract_text_from_xml, process_all_titles
+    download_title, extract_text_from_xml, load_sections, process_all_titles, sections_path
 )
-from backend.processors.bulk.downloader import TITLE_NAMES
+from backend.processors.bulk.downloader import TITLE_NUMS
 
 # Setup logging
 logging.basicConfig(
@@ -39,30 +44,50 @@ logging.basicConfig(
 )
 logger = logging.getLogger('bulk_to_db')
 
+# New sections are flushed, and their paragraphs inserted, in batches of this size
+SECTION_BATCH_SIZE = 1000
+
+@lru_cache(maxsize=1024)
 def parse_date(date_str: Optional[str]) -> Optional[datetime]:
     """Convert ISO date string to datetime object."""
     if not date_str:
         return None
     
+    # Dates come from the processor as YYYY-MM-DD; build the datetime
+    # directly rather than going through strptime's format parser
+    if len(date_str) != 10 or date_str[4] != '-' or date_str[7] != '-':
+        return None
+    
     try:
-        return datetime.strptime(date_str, "%Y-%m-%d")
+        return datetime(int(date_str[:4]), int(date_str[5:7]), int(date_str[8:10]))
     except ValueError:
         return None
 
+def _title_fields(title_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Map processed title data to the Title columns set on insert and update."""
+    dates = title_data.get("dates") or {}
+    return {
+        "name": title_data.get("name", ""),
+        "full_name": title_data.get("full_name", ""),
+        "reserved": False,
+        "up_to_date_as_of": parse_date(dates.get("up_to_date_as_of")),
+        "latest_amended_on": parse_date(dates.get("latest_amended_on")),
+        "latest_issue_date": parse_date(dates.get("latest_issue_date"))
+    }
+
 def create_database_tables():
     """Create all database tables if they don't exist."""
     logger.info("Creating database tables...")
     Base.metadata.create_all(bind=engine)
     logger.info("Database tables created or already exist.")
 
-def process_and_store_title(
+def download_and_parse_title(
     title_num: int, 
     xml_dir: str, 
     json_dir: str, 
-    db_session: Session, 
     force_download: bool = False
 ) -> Optional[Dict[str, Any]]:
-    """Download, process, and store a title in the database."""
+    """Download and process a title's XML; touches no database state."""
     # Step 1: Download the XML
     success, xml_path, _ = download_title(title_num, xml_dir, not force_download)
     if not success:
@@ -70,12 +95,41 @@ def process_and_store_title(
         return None
     
     # Step 2: Process the XML
-    title_data, json_path = extract_text_from_xml(xml_path, json_dir)
+    title_data, json_path = extract_text_from_xml(xml_path, json_dir, force=force_download)
     if not title_data:
         logger.error(f"Failed to process XML for title {title_num}")
         return None
     
-    # Step 3: Store in database
+    return title_data
+
+def process_and_store_title(
+    title_num: int, 
+    xml_dir: str, 
+    json_dir: str, 
+    db_session: Session, 
+    force_download: bool = False,
+    agency_ids: Optional[Dict[str, int]] = None
+) -> Optional[Dict[str, Any]]:
+    """Download, process, and store a title in the database."""
+    title_data = download_and_parse_title(title_num, xml_dir, json_dir, force_download)
+    if not title_data:
+        return None
+    
+    return store_title(title_num, title_data, json_dir, db_session, agency_ids)
+
+def store_title(
+    title_num: int, 
+    title_data: Dict[str, Any], 
+    json_dir: str, 
+    db_session: Session, 
+    agency_ids: Optional[Dict[str, int]] = None
+) -> Optional[Dict[str, Any]]:
+    """Store a processed title in the database.
+    
+    json_dir is the directory holding the title's JSON and section shard.
+    agency_ids is an optional per-run {agency name: id} cache shared across
+    titles; it is only extended once the title has been committed.
+    """
     try:
         # Check if title already exists
         existing_title = db_session.query(Title).filter(Title.number == title_num).first()
@@ -83,42 +137,25 @@ def process_and_store_title(
         if existing_title:
             logger.info(f"Updating existing title {title_num}")
             
-            # Update basic title information
-            existing_title.name = title_data.get("name", "")
-            existing_title.full_name = title_data.get("full_name", "")
-            existing_title.reserved = False
-            
-            # Update dates
-            dates = title_data.get("dates", {})
-            existing_title.up_to_date_as_of = parse_date(dates.get("up_to_date_as_of"))
-            existing_title.latest_amended_on = parse_date(dates.get("latest_amended_on"))
-            existing_title.latest_issue_date = parse_date(dates.get("latest_issue_date"))
+            # Update basic title information and dates
+            for key, value in _title_fields(title_data).items():
+                setattr(existing_title, key, value)
             
             title_obj = existing_title
-            db_session.commit()
         else:
             # Create new title
             title_obj = Title(
                 number=title_num,
-                name=title_data.get("name", ""),
-                full_name=title_data.get("full_name", ""),
-                reserved=False,
-                source_url=title_data.get("source_url")
+                source_url=title_data.get("source_url"),
+                **_title_fields(title_data)
             )
-            
-            # Set dates
-            dates = title_data.get("dates", {})
-            title_obj.up_to_date_as_of = parse_date(dates.get("up_to_date_as_of"))
-            title_obj.latest_amended_on = parse_date(dates.get("latest_amended_on"))
-            title_obj.latest_issue_date = parse_date(dates.get("latest_issue_date"))
-            
             db_session.add(title_obj)
-            db_session.commit()
-            db_session.refresh(title_obj)
+            # Flush to get the new title's id; committed with the rest below
+            db_session.flush()
         
         # Process agencies
         agencies = title_data.get("agencies", [])
-        process_agencies(db_session, title_obj, agencies)
+        new_agency_ids = process_agencies(db_session, title_obj, agencies, agency_ids)
         
         # Process metrics
         metrics = title_data.get("metrics", {})
@@ -126,7 +163,17 @@ def process_and_store_title(
         
         # Process chapters and sections if they exist
         process_chapters(db_session, title_obj, title_data.get("chapters", []))
-        process_sections(db_session, title_obj, title_data.get("sections", []))
+        sections_file = sections_path(title_data, json_dir)
+        if not os.path.exists(sections_file):
+            # Fail the title rather than commit it without its sections
+            raise FileNotFoundError(f"Section file not found: {sections_file}")
+        process_sections(db_session, title_obj, load_sections(sections_file))
+        
+        # Commit the title and all of its rows in one transaction
+        db_session.commit()
+        
+        if agency_ids is not None:
+            agency_ids.update(new_agency_ids)
         
         return title_data
         
@@ -135,32 +182,47 @@ def process_and_store_title(
         db_session.rollback()
         return None
 
-def process_agencies(db_session: Session, title_obj: Title, agencies: List[str]):
-    """Process and store agencies in the database."""
-    # Clear existing agencies first
-    for agency_name in agencies:
-        if not agency_name:
-            continue
-            
-        # Check if agency exists
-        existing_agency = db_session.query(Agency).filter(
-            Agency.name == agency_name
-        ).first()
-        
-        if existing_agency:
-            # Associate with title if not already
-            if existing_agency not in title_obj.agencies:
-                title_obj.agencies.append(existing_agency)
-        else:
-            # Create new agency
-            agency = Agency(
-                name=agency_name,
-                identifier=f"agency-{agency_name.lower().replace(' ', '-')}"
-            )
-            db_session.add(agency)
-            title_obj.agencies.append(agency)
+def process_agencies(
+    db_session: Session, 
+    title_obj: Title, 
+    agencies: List[str], 
+    agency_ids: Optional[Dict[str, int]] = None
+) -> Dict[str, int]:
+    """Process and store agencies in the database.
+    
+    Returns {name: id} for the agencies created here.
+    """
+    agency_names = list(dict.fromkeys(name for name in agencies if name))
+    if not agency_names:
+        return {}
+    
+    # Without a run-level cache, look up the title's agencies in one query
+    if agency_ids is None:
+        agency_ids = dict(
+            db_session.query(Agency.name, Agency.id).filter(Agency.name.in_(agency_names))
+        )
     
-    db_session.commit()
+    # Create missing agencies, flushing once to assign their ids
+    new_agencies = [
+        Agency(
+            name=agency_name,
+            identifier=f"agency-{agency_name.lower().replace(' ', '-')}"
+        )
+        for agency_name in agency_names
+        if agency_name not in agency_ids
+    ]
+    new_agency_ids = {}
+    if new_agencies:
+        db_session.add_all(new_agencies)
+        db_session.flush()
+        new_agency_ids = {agency.name: agency.id for agency in new_agencies}
+    
+    # A title has a single agency; use the first one listed
+    if title_obj.agency_id is None:
+        first_name = agency_names[0]
+        title_obj.agency_id = agency_ids.get(first_name) or new_agency_ids[first_name]
+    
+    return new_agency_ids
 
 def process_metrics(db_session: Session, title_obj: Title, metrics: Dict[str, int]):
     """Process and store metrics in the database."""
@@ -172,61 +234,95 @@ def process_metrics(db_session: Session, title_obj: Title, metrics: Dict[str, in
         paragraph_count=metrics.get("paragraph_count", 0)
     )
     db_session.add(metrics_obj)
-    db_session.commit()
 
 def process_chapters(db_session: Session, title_obj: Title, chapters: List[Dict[str, Any]]):
     """Process and store chapters in the database."""
-    # First clear existing chapters
+    # Fetch the ids of the title's existing chapters in one query
+    existing_ids = {}
+    for chapter_id, chapter_num in db_session.query(Chapter.id, Chapter.number).filter(
+        Chapter.title_id == title_obj.id
+    ).order_by(Chapter.id):
+        existing_ids.setdefault(chapter_num, chapter_id)
+    
+    updated_chapters = []
+    new_chapters = []
     for chapter in chapters:
         chapter_num = chapter.get("number", "")
         if not chapter_num:
             continue
-            
-        # Check if chapter exists
-        existing_chapter = db_session.query(Chapter).filter(
-            Chapter.number == chapter_num,
-            Chapter.title_id == title_obj.id
-        ).first()
         
-        if existing_chapter:
+        chapter_id = existing_ids.get(chapter_num)
+        if chapter_id is not None:
             # Update chapter
-            existing_chapter.name = chapter.get("name", "")
-            existing_chapter.identifier = chapter.get("identifier", "")
-            existing_chapter.description = chapter.get("description", "")
-            existing_chapter.agency_name = chapter.get("agency_name", "")
+            updated_chapters.append({
+                "id": chapter_id,
+                "name": chapter.get("name", ""),
+                "identifier": chapter.get("identifier", ""),
+                "description": chapter.get("description", ""),
+                "agency_name": chapter.get("agency_name", "")
+            })
         else:
-            # Create new chapter
-            chapter_obj = Chapter(
-                number=chapter_num,
-                name=chapter.get("name", ""),
-                title_id=title_obj.id,
-                identifier=chapter.get("identifier", ""),
-                description=chapter.get("description", ""),
-                agency_name=chapter.get("agency_name", "")
-            )
-            db_session.add(chapter_obj)
+            # Queue new chapter for a single batched insert
+            new_chapters.append({
+                "number": chapter_num,
+                "name": chapter.get("name", ""),
+                "title_id": title_obj.id,
+                "identifier": chapter.get("identifier", ""),
+                "description": chapter.get("description", ""),
+                "agency_name": chapter.get("agency_name", "")
+            })
+    
+    if updated_chapters:
+        db_session.bulk_update_mappings(Chapter, updated_chapters)
+    if new_chapters:
+        db_session.execute(insert(Chapter), new_chapters)
+
+def _insert_section_paragraphs(db_session: Session, new_sections: List[Tuple[Section, List[Dict[str, Any]]]]):
+    """Flush pending sections for their ids, then insert their paragraphs in one batch."""
+    db_session.flush()
     
-    db_session.commit()
+    paragraphs = [
+        {
+            "section_id": section_obj.id,
+            "identifier": para.get("identifier", f"p{i}"),
+            "text_content": para.get("content", ""),
+            "level": para.get("level", 1),
+            "order_index": i
+        }
+        for section_obj, section_paragraphs in new_sections
+        for i, para in enumerate(section_paragraphs)
+    ]
+    if paragraphs:
+        db_session.bulk_insert_mappings(Paragraph, paragraphs)
+    
+    new_sections.clear()
 
-def process_sections(db_session: Session, title_obj: Title, sections: List[Dict[str, Any]]):
+def process_sections(db_session: Session, title_obj: Title, sections: Iterable[Dict[str, Any]]):
     """Process and store sections in the database."""
-    # Store sections - these might be root sections not associated with parts
+    # Store sections - these might be root sections not associated with parts.
+    # Fetch the ids of existing root sections in one query.
+    existing_ids = {}
+    for section_id, section_num in db_session.query(Section.id, Section.number).filter(
+        Section.part_id.is_(None)
+    ).order_by(Section.id):
+        existing_ids.setdefault(section_num, section_id)
+    
+    updated_sections = []
+    new_sections = []  # (Section, paragraph dicts) awaiting a flush
     for section in sections:
         section_num = section.get("number", "")
         if not section_num:
             continue
-            
-        # Check if section exists
-        existing_section = db_session.query(Section).filter(
-            Section.number == section_num,
-            Section.part_id == None  # Only get root sections
-        ).first()
         
-        if existing_section:
+        section_id = existing_ids.get(section_num)
+        if section_id is not None:
             # Update section
-            existing_section.name = section.get("name", "")
-            existing_section.text_content = section.get("content", "")
-            existing_section.full_identifier = section.get("full_identifier", "")
+            updated_sections.append({
+                "id": section_id,
+                "name": section.get("name", ""),
+                "text_content": section.get("content", ""),
+                "full_identifier": section.get("full_identifier", "")
+            })
         else:
             # Create new section
             section_obj = Section(
@@ -236,18 +332,15 @@ def process_sections(db_session: Session, title_obj: Title, sections: List[Dict[
                 full_identifier=section.get("full_identifier", "")
             )
             db_session.add(section_obj)
+            new_sections.append((section_obj, section.get("paragraphs", [])))
             
-            # Process paragraphs
-            for i, para in enumerate(section.get("paragraphs", [])):
-                para_obj = Paragraph(
-                    identifier=para.get("identifier", f"p{i}"),
-                    text_content=para.get("content", ""),
-                    level=para.get("level", 1),
-                    order_index=i
-                )
-                section_obj.paragraphs.append(para_obj)
-    
-    db_session.commit()
+            if len(new_sections) >= SECTION_BATCH_SIZE:
+                _insert_section_paragraphs(db_session, new_sections)
+    
+    if new_sections:
+        _insert_section_paragraphs(db_session, new_sections)
+    if updated_sections:
+        db_session.bulk_update_mappings(Section, updated_sections)
 
 def process_all_titles_to_db(
     data_dir: str,
@@ -267,31 +360,51 @@ def process_all_titles_to_db(
     create_database_tables()
     
     # Determine which titles to process
-    titles_to_process = title_nums or list(TITLE_NAMES.keys())
+    titles_to_process = title_nums or TITLE_NUMS
     logger.info(f"Will process {len(titles_to_process)} titles with {max_workers} workers")
     
-    # Process titles sequentially (database operations)
-    success_count = 0
-    db = next(get_db())
+    # Download and parse titles on a worker pool while this thread stores
+    # finished ones, so network, parsing and database work overlap. The
+    # bounded queue keeps workers from getting far ahead of the writer, and
+    # the session is only ever used from this thread.
+    parsed = queue.Queue(maxsize=max_workers * 2)
+    stop = threading.Event()
+    
+    def produce(title_num: int):
+        title_data = None
+        try:
+            title_data = download_and_parse_title(title_num, xml_dir, json_dir, force_download)
+        except Exception as e:
+            logger.error(f"Error processing title {title_num}: {e}")
+        
+        # Give up if the writer has stopped, rather than blocking forever
+        while not stop.is_set():
+            try:
+                parsed.put((title_num, title_data), timeout=1)
+                return
+            except queue.Full:
+                continue
     
+    success_count = 0
+    executor = ThreadPoolExecutor(max_workers=max_workers)
     try:
         for title_num in titles_to_process:
-            title_data = process_and_store_title(
-                title_num=title_num,
-                xml_dir=xml_dir,
-                json_dir=json_dir,
-                db_session=db,
-                force_download=force_download
-            )
+            executor.submit(produce, title_num)
+        
+        with closing(SessionLocal()) as db:
+            # Agencies repeat across titles; load them all once for the run
+            agency_ids = dict(db.query(Agency.name, Agency.id))
             
-            if title_data:
-                success_count += 1
-                logger.info(f"Processed and stored title {title_num} successfully")
-            else:
-                logger.error(f"Failed to process or store title {title_num}")
-    
+            for _ in range(len(titles_to_process)):
+                title_num, title_data = parsed.get()
+                if title_data and store_title(title_num, title_data, json_dir, db, agency_ids):
+                    success_count += 1
+                    logger.info(f"Processed and stored title {title_num} successfully")
+                else:
+                    logger.error(f"Failed to process or store title {title_num}")
     finally:
-        db.close()
+        stop.set()
+        executor.shutdown(cancel_futures=True)
     
     logger.info(f"Processed {success_count} of {len(titles_to_process)} titles successfully")
     
@@ -313,20 +426,19 @@ def main():
     # Define directories
     data_dir = args.data_dir
     xml_dir = os.path.join(data_dir, "xml")
-    json_dir = os.path.join(data_dir, "processed")
     
-    # Create directories
-    os.makedirs(data_dir, exist_ok=True)
+    # Create directories (process_all_titles_to_db creates the processed dir)
     os.makedirs(xml_dir, exist_ok=True)
-    os.makedirs(json_dir, exist_ok=True)
     
     # Database info mode
     if args.info:
-        db = next(get_db())
-        try:
-            title_count = db.query(Title).count()
-            agency_count = db.query(Agency).count()
-            section_count = db.query(Section).count()
+        with closing(SessionLocal()) as db:
+            # Fetch all three counts in one round-trip
+            title_count, agency_count, section_count = db.execute(text(
+                "SELECT (SELECT count(*) FROM title), "
+                "(SELECT count(*) FROM agency), "
+                "(SELECT count(*) FROM section)"
+            )).one()
             
             print("\neCFR Database Information:")
             print("=" * 80)
@@ -342,16 +454,16 @@ def main():
             ).join(
                 RegulationMetrics, 
                 RegulationMetrics.title_id == Title.id
-            ).all()
+            ).order_by(Title.number).yield_per(1000)
             
-            if metrics:
-                print("\nTitle Metrics:")
-                for title_num, title_name, word_count in sorted(metrics, key=lambda x: x[0]):
-                    print(f"  Title {title_num}: {title_name} - {word_count or 0:,} words")
+            header_printed = False
+            for title_num, title_name, word_count in metrics:
+                if not header_printed:
+                    print("\nTitle Metrics:")
+                    header_printed = True
+                print(f"  Title {title_num}: {title_name} - {word_count or 0:,} words")
             
             return 0
-        finally:
-            db.close()
     
     # Determine titles to process
     title_nums = None
@@ -372,7 +484,7 @@ def main():
                 print(f"Title {title_num}: {'Success' if success else 'Failed'} ({file_size} bytes)")
         else:
             # Download all titles
-            for title_num in TITLE_NAMES.keys():
+            for title_num in TITLE_NUMS:
                 success, file_path, file_size = download_title(title_num, xml_dir, not args.force)
                 print(f"Title {title_num}: {'Success' if success else 'Failed'} ({file_size} bytes)")
         return 0
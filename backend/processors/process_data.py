@@ -11,14 +11,16 @@ This script:
 """
 
 import os
+import re
 import sys
 import logging
-import json
 import argparse
-from typing import List, Dict, Any, Optional
-import concurrent.futures
-from pathlib import Path
-import pandas as pd
+from typing import List, Dict, Any, Iterable, Iterator, Optional
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+
+import orjson
 
 # Setup logging
 logging.basicConfig(
@@ -33,116 +35,138 @@ logger = logging.getLogger('process_data')
 # from ..utils.config import settings
 # from .analyzer import analyze_text, count_words, calculate_readability, extract_term_frequencies
 
+# Files read per batch for each worker when streaming cached regulations
+READ_BATCH_FACTOR = 4
+
+# "Source:" and "Identifier:" header lines in cached markdown files
+_HEADER_RE = re.compile(r'^(Source|Identifier):(.*)$', re.M)
+
 def setup_database():
     """Create database tables if they don't exist."""
     logger.info("Setting up database...")
     # Base.metadata.create_all(bind=engine)
     logger.info("Database setup complete.")
 
-def load_cached_regulations(data_dir: str) -> List[Dict[str, Any]]:
-    """Load regulations from cached files."""
+def _iter_markdown_files(dir_path: str, rel_parts: tuple = ()):
+    """Yield (path, relative path parts) for each markdown file under dir_path."""
+    with os.scandir(dir_path) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                yield from _iter_markdown_files(entry.path, rel_parts + (entry.name,))
+            elif entry.name.endswith('.md'):
+                yield entry.path, rel_parts + (entry.name,)
+
+def _read_regulation(file_path: str, parts: tuple) -> Optional[Dict[str, Any]]:
+    """Read a cached markdown file into a regulation dict."""
+    file = parts[-1]
+    try:
+        # Extract agency and title if available in path
+        agency = parts[0] if len(parts) > 0 else "Unknown"
+        title = parts[1] if len(parts) > 1 else "Unknown"
+        
+        # Read file content
+        with open(file_path, 'r', encoding='utf-8') as f:
+            content = f.read()
+        
+        # Basic parsing of markdown content
+        first_line = content.partition('\n')[0]
+        name = first_line.replace('# ', '') if first_line.startswith('# ') else file
+        
+        # Extract URL and identifier if present (the last occurrence wins)
+        headers = dict(_HEADER_RE.findall(content))
+        url = headers.get('Source', '').strip()
+        identifier = headers.get('Identifier', '').strip()
+        
+        # Create regulation object
+        return {
+            'identifier': identifier or os.path.splitext(file)[0],
+            'name': name,
+            'agency': agency.replace('Agency_', '').replace('_', ' '),
+            'title': title.replace('Title_', '').replace('_', ' '),
+            'html_url': url,
+            'text_content': content,
+            'path': file_path
+        }
+        
+    except Exception as e:
+        logger.error(f"Error processing file {file_path}: {e}")
+        return None
+
+def iter_cached_regulations(data_dir: str, max_workers: int = 4) -> Iterator[Dict[str, Any]]:
+    """Yield regulations from cached files as they are read."""
     logger.info(f"Loading cached regulations from {data_dir}")
     
-    regulations = []
     formatted_dir = os.path.join(data_dir, "formatted")
     
     if not os.path.exists(formatted_dir):
         logger.warning(f"Formatted directory not found at {formatted_dir}")
-        return regulations
-    
-    # Walk through the formatted directory
-    for root, dirs, files in os.walk(formatted_dir):
-        for file in files:
-            if file.endswith('.md'):
-                file_path = os.path.join(root, file)
-                try:
-                    # Extract hierarchy from path
-                    rel_path = os.path.relpath(file_path, formatted_dir)
-                    parts = Path(rel_path).parts
-                    
-                    # Extract agency and title if available in path
-                    agency = parts[0] if len(parts) > 0 else "Unknown"
-                    title = parts[1] if len(parts) > 1 else "Unknown"
-                    
-                    # Read file content
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        content = f.read()
-                    
-                    # Basic parsing of markdown content
-                    lines = content.split('\n')
-                    name = lines[0].replace('# ', '') if lines and lines[0].startswith('# ') else file
-                    
-                    # Extract URL and identifier if present
-                    url = ""
-                    identifier = ""
-                    for line in lines:
-                        if line.startswith('Source:'):
-                            url = line.replace('Source:', '').strip()
-                        elif line.startswith('Identifier:'):
-                            identifier = line.replace('Identifier:', '').strip()
-                    
-                    # Create regulation object
-                    regulation = {
-                        'identifier': identifier or os.path.splitext(file)[0],
-                        'name': name,
-                        'agency': agency.replace('Agency_', '').replace('_', ' '),
-                        'title': title.replace('Title_', '').replace('_', ' '),
-                        'html_url': url,
-                        'text_content': content,
-                        'path': file_path
-                    }
-                    
-                    regulations.append(regulation)
-                    
-                except Exception as e:
-                    logger.error(f"Error processing file {file_path}: {e}")
-    
-    logger.info(f"Loaded {len(regulations)} regulations from cache")
-    return regulations
-
-def process_regulations(regulations: List[Dict[str, Any]], max_workers: int = 4) -> Dict[str, Any]:
-    """Process regulations and extract metrics."""
-    logger.info(f"Processing {len(regulations)} regulations with {max_workers} workers")
-    
-    # Placeholder for now - would use the actual analyzer in production
-    def process_regulation(reg: Dict[str, Any]) -> Dict[str, Any]:
-        return {
-            'regulation_id': reg['identifier'],
-            'title': reg['name'],
-            'agency': reg['agency'],
-            'word_count': len(reg['text_content'].split()),
-            'readability_score': 50.0,  # Placeholder
-            'sentence_count': reg['text_content'].count('.'),
-            'paragraph_count': reg['text_content'].count('\n\n')
-        }
-    
-    results = []
-    
-    # Process in parallel
-    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
-        future_to_reg = {executor.submit(process_regulation, reg): reg for reg in regulations}
-        for future in concurrent.futures.as_completed(future_to_reg):
-            reg = future_to_reg[future]
-            try:
-                result = future.result()
-                results.append(result)
-                logger.debug(f"Processed regulation {reg['identifier']}")
-            except Exception as e:
-                logger.error(f"Error processing regulation {reg['identifier']}: {e}")
+        return
     
-    # Convert to DataFrame for aggregation
-    df = pd.DataFrame(results)
+    # Reading files is I/O-bound, so overlap the reads with a thread pool.
+    # Files are submitted in small batches so only a few are held at once.
+    count = 0
+    files = _iter_markdown_files(formatted_dir)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        while True:
+            batch = list(islice(files, max_workers * READ_BATCH_FACTOR))
+            if not batch:
+                break
+            for regulation in executor.map(lambda item: _read_regulation(*item), batch):
+                if regulation is not None:
+                    count += 1
+                    yield regulation
+    
+    logger.info(f"Loaded {count} regulations from cache")
+
+def load_cached_regulations(data_dir: str, max_workers: int = 4) -> List[Dict[str, Any]]:
+    """Load regulations from cached files."""
+    return list(iter_cached_regulations(data_dir, max_workers=max_workers))
+
+def process_regulations(regulations: Iterable[Dict[str, Any]], max_workers: int = 4) -> Optional[Dict[str, Any]]:
+    """Process regulations and extract metrics.
+    
+    Returns None if there were no regulations to process.
+    """
+    # Aggregate in a single pass; only per-agency accumulators are kept.
+    # max_workers is accepted for compatibility but no longer used.
+    total_regulations = 0
+    total_word_count = 0
+    total_readability = 0.0
+    # agency -> [word_count, readability_sum, regulation_count]
+    agency_totals = defaultdict(lambda: [0, 0.0, 0])
+    
+    for reg in regulations:
+        word_count = len(reg['text_content'].split())
+        readability_score = 50.0  # Placeholder - would use the actual analyzer in production
+        
+        total_regulations += 1
+        total_word_count += word_count
+        total_readability += readability_score
+        
+        totals = agency_totals[reg['agency']]
+        totals[0] += word_count
+        totals[1] += readability_score
+        totals[2] += 1
+    
+    if not total_regulations:
+        return None
+    
+    logger.info(f"Processed {total_regulations} regulations")
     
     # Calculate aggregate metrics
     metrics = {
-        'total_regulations': len(df),
-        'total_word_count': int(df['word_count'].sum()),
-        'average_readability': float(df['readability_score'].mean()),
-        'average_word_count': int(df['word_count'].mean()),
-        'by_agency': df.groupby('agency').agg({
-            'word_count': 'sum',
-            'readability_score': 'mean'
-        }).reset_index().to_dict('records')
+        'total_regulations': total_regulations,
+        'total_word_count': total_word_count,
+        'average_readability': total_readability / total_regulations,
+        'average_word_count': int(total_word_count / total_regulations),
+        'by_agency': [
+            {
+                'agency': agency,
+                'word_count': word_sum,
+                'readability_score': readability_sum / count
+            }
+            for agency, (word_sum, readability_sum, count) in sorted(agency_totals.items())
+        ]
     }
     
     return metrics
@@ -151,8 +175,12 @@ def save_metrics(metrics: Dict[str, Any], output_path: str):
     """Save metrics to a JSON file."""
     os.makedirs(os.path.dirname(output_path), exist_ok=True)
     
-    with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump(metrics, f, indent=2)
+    # Write to a temporary file and swap it in, so readers never see a
+    # partially written metrics file
+    tmp_path = output_path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(orjson.dumps(metrics, option=orjson.OPT_INDENT_2))
+    os.replace(tmp_path, output_path)
     
     logger.info(f"Saved metrics to {output_path}")
 
@@ -161,16 +189,14 @@ def main(data_dir: str, output_dir: str, max_workers: int = 4):
     # Set up the database
     # setup_database()
     
-    # Load regulations from cache
-    regulations = load_cached_regulations(data_dir)
+    # Stream regulations from cache and calculate metrics
+    regulations = iter_cached_regulations(data_dir, max_workers=max_workers)
+    metrics = process_regulations(regulations, max_workers=max_workers)
     
-    if not regulations:
+    if metrics is None:
         logger.error("No regulations found. Please run the scraper first.")
         return
     
-    # Process regulations and calculate metrics
-    metrics = process_regulations(regulations, max_workers=max_workers)
-    
     # Save metrics to output file
     output_path = os.path.join(output_dir, "metrics.json")
     save_metrics(metrics, output_path)
@@ -8,15 +8,27 @@ This module handles fetching data from the eCFR API and website.
 import os
 import re
 import time
-import json
+import tempfile
+import threading
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
 import hashlib
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer, Tag
+from collections import OrderedDict
 from dataclasses import dataclass, field
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple, Union, Callable, Iterable, Iterator
+from functools import cached_property, partial
 import concurrent.futures
 import logging
 
+from ..utils import config
+
+try:
+    from html2text import HTML2Text
+except ImportError:  # Formatted output falls back to plain text
+    HTML2Text = None
+
 # Setup logging
 logging.basicConfig(
     level=logging.INFO,
@@ -24,6 +36,90 @@ logging.basicConfig(
 )
 logger = logging.getLogger('ecfr_scraper')
 
+# Bump when the cache key or file format changes, so stale entries are ignored
+CACHE_VERSION = "v2"
+
+# How the formatted/ files are written: converted to markdown with html2text,
+# as paragraph-separated plain text (much faster), or not at all
+FORMATTED_MODES = ('markdown', 'text', 'none')
+
+# Patterns used when cleaning scraped HTML and building filenames
+_RE_COMMENT = re.compile(r'<!\-\-.*?\-\->', re.DOTALL)
+_RE_WS = re.compile(r'\s+')
+_RE_BR = re.compile(r'<br\s*/?>')
+_RE_DIV_H = [
+    (re.compile(f'<div[^>]*?class=["\']h{i}["\'][^>]*?>(.*?)</div>'), f'<h{i}>\\1</h{i}>')
+    for i in range(1, 7)
+]
+_RE_NL3 = re.compile(r'\n{3,}')
+_RE_BAD_LINK = re.compile(r'!?\[\]\((?:javascript|data):.*?\)')
+_RE_SENTENCE_END = re.compile(r'(\. )')
+_RE_SAFE = re.compile(r'[^\w\s-]')
+_RE_WS_DASH = re.compile(r'[\s-]+')
+
+# Parse only the parts of a page we read; anything else is skipped by the parser
+_MAIN_STRAINER = SoupStrainer('main', id='main-content')
+_SECTION_STRAINER = SoupStrainer(['main', 'h1', 'h2'])
+
+def _iter_tags(soup: Tag, names: Tuple[str, ...]) -> Iterator[Tag]:
+    """Yield descendant tags with one of the given names, in document order."""
+    return (tag for tag in soup.descendants if tag.name in names)
+
+def _attr_contains(tag: Tag, attr: str, words: Tuple[str, ...]) -> bool:
+    """Return True if the tag's attribute contains any of words, ignoring case."""
+    value = tag.get(attr)
+    if not value:
+        return False
+    if isinstance(value, list):
+        value = ' '.join(value)
+    value = value.lower()
+    return any(word in value for word in words)
+
+def _first_match(tags: Iterator[Tag], *predicates: Callable[[Tag], bool]) -> Optional[Tag]:
+    """Return the first tag matching the earliest predicate, in one pass over tags.
+    
+    Equivalent to trying soup.find with each predicate in turn, without
+    walking the tree once per predicate.
+    """
+    found = [None] * len(predicates)
+    for tag in tags:
+        for i, predicate in enumerate(predicates):
+            if found[i] is None and predicate(tag):
+                found[i] = tag
+        if found[0] is not None:
+            break
+    return next((tag for tag in found if tag is not None), None)
+
+def _cache_key(url: str) -> str:
+    """Return a short, filesystem-safe cache key for a URL."""
+    return hashlib.blake2b(url.encode('utf-8'), digest_size=8).hexdigest()
+
+class _TokenBucket:
+    """Thread-safe token bucket allowing `rate` acquisitions per second on average."""
+    
+    def __init__(self, rate: float, capacity: float = 1.0):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def acquire(self) -> None:
+        """Take a token, sleeping until it is available."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            # Reserve the token now and sleep outside the lock, so waiting
+            # threads are served in the order they arrived
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait > 0:
+            time.sleep(wait)
+
+class PageTooLargeError(Exception):
+    """Raised when a web page is larger than ECFRScraper.MAX_PAGE_BYTES."""
+
 @dataclass
 class ECFRTitle:
     """Represents a title from the eCFR API."""
@@ -54,14 +150,29 @@ class ECFRScraper:
         "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
         "Accept": "application/json"
     }
-    DELAY = 1.0  # Delay between requests in seconds (reasonable to avoid server strain)
+    DELAY = 1.0  # Average delay between requests in seconds, if settings.API_DELAY is not positive
+    BURST = 2  # Requests that may be sent back to back before DELAY applies
     MAX_RETRIES = 3  # Maximum number of retries for each request
     RETRY_DELAY = 5.0  # Delay between retries in seconds
+    RENDER_CACHE_SIZE = 1024  # Rendered documents kept in memory, keyed by HTML digest
+    PAGE_CHUNK_SIZE = 64 * 1024  # Bytes read per chunk when streaming web pages
+    MAX_PAGE_BYTES = 32 * 1024 * 1024  # Largest web page we are willing to download
     
-    def __init__(self, output_dir: str):
-        """Initialize the scraper with output directories."""
+    def __init__(self, output_dir: str, max_workers: int = 8, formatted: str = 'markdown',
+                 use_cache: Optional[bool] = None):
+        """Initialize the scraper with output directories.
+        
+        formatted is one of FORMATTED_MODES: 'text' writes the formatted files
+        as paragraph-separated text instead of running the much slower
+        html2text conversion, and 'none' skips them and writes only plain
+        text. use_cache defaults to settings.USE_CACHE.
+        """
+        if formatted not in FORMATTED_MODES:
+            raise ValueError(f"formatted must be one of {', '.join(FORMATTED_MODES)}, not {formatted!r}")
         
         self.output_dir = output_dir
+        self.max_workers = max_workers  # Parallel section fetches per title
+        self.formatted = formatted
         self.formatted_dir = os.path.join(output_dir, "formatted")
         self.plain_dir = os.path.join(output_dir, "plain")
         
@@ -69,18 +180,82 @@ class ECFRScraper:
         os.makedirs(self.formatted_dir, exist_ok=True)
         os.makedirs(self.plain_dir, exist_ok=True)
         
-        # Set up cache directory
-        self.cache_dir = os.path.join(output_dir, "cache")
-        os.makedirs(self.cache_dir, exist_ok=True)
+        # Set up cache directory; without one, every request goes to the network
+        if use_cache is None:
+            use_cache = config.settings.USE_CACHE
+        if use_cache:
+            self.cache_dir = os.path.join(output_dir, "cache", CACHE_VERSION)
+            os.makedirs(self.cache_dir, exist_ok=True)
         
-        # Create a session for reuse
+        # Create a session for reuse, with a connection pool large enough for
+        # every worker to keep its own connection to the host alive
         self.session = requests.Session()
         self.session.headers.update(self.HEADERS)
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
         
         # Track hierarchy for better organization
         self.current_hierarchy = {}
+        
+        # (markdown, plain text) renderings of recently saved HTML, so retries
+        # and pages repeated across titles are not converted again
+        self._render_cache = OrderedDict()
+        
+        # Shared by every worker thread; cache hits never touch it. Paced by
+        # API_DELAY or API_RATE_LIMIT (requests per minute), whichever is stricter
+        delay = config.settings.API_DELAY if config.settings.API_DELAY > 0 else self.DELAY
+        rate = 1 / delay
+        if config.settings.API_RATE_LIMIT > 0:
+            rate = min(rate, config.settings.API_RATE_LIMIT / 60)
+        self._rate_limiter = _TokenBucket(rate=rate, capacity=self.BURST)
+        
+        # Parsed API responses by endpoint, so the titles list is loaded once
+        self._api_cache = {}
+        
+        # Output directories already created, so saves skip the mkdir syscalls
+        self._created_dirs = {self.formatted_dir, self.plain_dir}
+    
+    def _cache_hit(self, cache_file: str) -> bool:
+        """Return True if a non-empty cache entry exists, discarding empty ones."""
+        try:
+            size = os.stat(cache_file).st_size
+        except FileNotFoundError:
+            return False
+        if size == 0:
+            logger.warning(f"Discarding empty cache file: {cache_file}")
+            self._discard_cache(cache_file)
+            return False
+        return True
+    
+    def _discard_cache(self, cache_file: str) -> None:
+        """Remove a cache entry, ignoring errors."""
+        try:
+            os.unlink(cache_file)
+        except OSError:
+            pass
+    
+    def _write_cache(self, cache_file: str, payload: bytes) -> None:
+        """Atomically write a cache entry, so readers never see a partial file."""
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, prefix='.tmp-')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(payload)
+                os.replace(tmp_path, cache_file)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+        except Exception as e:
+            logger.warning(f"Failed to write to cache: {e}")
     
     def fetch_api(self, endpoint: str) -> Any:
+        """Fetch data from the API, reusing responses this scraper has already loaded."""
+        if endpoint not in self._api_cache:
+            self._api_cache[endpoint] = self._fetch_api_raw(endpoint)
+        return self._api_cache[endpoint]
+    
+    def _fetch_api_raw(self, endpoint: str) -> Any:
         """Fetch data from the API with retries for rate limiting."""
         
         url = f"{self.API_URL}/{endpoint}"
@@ -88,52 +263,50 @@ class ECFRScraper:
         
         # Check cache if available
         if hasattr(self, 'cache_dir'):
-            cache_key = hashlib.md5(url.encode()).hexdigest()
+            cache_key = _cache_key(url)
             cache_file = os.path.join(self.cache_dir, f"{cache_key}.json")
             
             # Return from cache if it exists
-            if os.path.exists(cache_file):
+            if self._cache_hit(cache_file):
                 logger.info(f"Loading from cache: {url}")
                 try:
-                    with open(cache_file, 'r', encoding='utf-8') as f:
-                        return json.load(f)
+                    with open(cache_file, 'rb') as f:
+                        return orjson.loads(f.read())
+                except ValueError as e:
+                    # Corrupt entry; drop it so this fetch re-caches it cleanly
+                    logger.warning(f"Discarding unreadable cache file {cache_file}: {e}")
+                    self._discard_cache(cache_file)
                 except Exception as e:
                     logger.warning(f"Failed to load from cache: {e}")
                     # Continue with regular fetch if cache load fails
         
         # Use session if available
-        request_func = self.session.get if hasattr(self, 'session') else requests.get
+        request_func = self.session.get if hasattr(self, 'session') else partial(requests.get, headers=self.HEADERS)
         
         for attempt in range(self.MAX_RETRIES):
             try:
-                # Add reasonable delay before requests
                 if attempt > 0:
                     # Exponential backoff for retries
                     retry_sleep = self.RETRY_DELAY * (2 ** (attempt - 1))
                     logger.info(f"Retry attempt {attempt+1}/{self.MAX_RETRIES}. Waiting {retry_sleep} seconds...")
                     time.sleep(retry_sleep)
-                else:
-                    time.sleep(self.DELAY)  # Standard delay for first attempt
-                
-                response = request_func(url, headers=self.HEADERS, timeout=30)
                 
-                # Handle rate limiting
-                if response.status_code == 429:
-                    wait_time = int(response.headers.get('Retry-After', self.RETRY_DELAY))
-                    logger.warning(f"Rate limited! Waiting {wait_time} seconds before retry...")
-                    time.sleep(wait_time)
-                    continue
-                
-                response.raise_for_status()
-                data = response.json()
+                # Keep all workers together under the request rate limit
+                self._rate_limiter.acquire()
+                with request_func(url, timeout=30, stream=True) as response:
+                    # Handle rate limiting
+                    if response.status_code == 429:
+                        wait_time = int(response.headers.get('Retry-After', self.RETRY_DELAY))
+                        logger.warning(f"Rate limited! Waiting {wait_time} seconds before retry...")
+                        time.sleep(wait_time)
+                        continue
+                    
+                    response.raise_for_status()
+                    data = orjson.loads(response.content)
                 
                 # Save to cache if we have a cache directory
                 if hasattr(self, 'cache_dir'):
-                    try:
-                        with open(cache_file, 'w', encoding='utf-8') as f:
-                            json.dump(data, f)
-                    except Exception as e:
-                        logger.warning(f"Failed to write to cache: {e}")
+                    self._write_cache(cache_file, orjson.dumps(data))
                 
                 return data
                 
@@ -157,55 +330,68 @@ class ECFRScraper:
         
         # Check cache if available
         if hasattr(self, 'cache_dir'):
-            cache_key = hashlib.md5(url.encode()).hexdigest()
+            cache_key = _cache_key(url)
             cache_file = os.path.join(self.cache_dir, f"{cache_key}.html")
             
             # Return from cache if it exists
-            if os.path.exists(cache_file):
+            if self._cache_hit(cache_file):
                 logger.info(f"Loading from cache: {url}")
                 try:
                     with open(cache_file, 'r', encoding='utf-8') as f:
                         return f.read()
+                except ValueError as e:
+                    # Corrupt entry; drop it so this fetch re-caches it cleanly
+                    logger.warning(f"Discarding unreadable cache file {cache_file}: {e}")
+                    self._discard_cache(cache_file)
                 except Exception as e:
                     logger.warning(f"Failed to load from cache: {e}")
                     # Continue with regular fetch if cache load fails
         
         # Use session if available
-        request_func = self.session.get if hasattr(self, 'session') else requests.get
+        request_func = self.session.get if hasattr(self, 'session') else partial(requests.get, headers=self.HEADERS)
         
         for attempt in range(self.MAX_RETRIES):
             try:
-                # Add reasonable delay before requests
                 if attempt > 0:
                     # Exponential backoff for retries
                     retry_sleep = self.RETRY_DELAY * (2 ** (attempt - 1))
                     logger.info(f"Retry attempt {attempt+1}/{self.MAX_RETRIES}. Waiting {retry_sleep} seconds...")
                     time.sleep(retry_sleep)
-                else:
-                    time.sleep(self.DELAY)  # Standard delay for first attempt
                 
-                response = request_func(url, headers=self.HEADERS, timeout=30)
-                
-                # Handle rate limiting
-                if response.status_code == 429:
-                    wait_time = int(response.headers.get('Retry-After', self.RETRY_DELAY))
-                    logger.warning(f"Rate limited! Waiting {wait_time} seconds before retry...")
-                    time.sleep(wait_time)
-                    continue
-                
-                response.raise_for_status()
-                html_content = response.text
+                # Keep all workers together under the request rate limit
+                self._rate_limiter.acquire()
+                with request_func(url, timeout=30, stream=True) as response:
+                    # Handle rate limiting
+                    if response.status_code == 429:
+                        wait_time = int(response.headers.get('Retry-After', self.RETRY_DELAY))
+                        logger.warning(f"Rate limited! Waiting {wait_time} seconds before retry...")
+                        time.sleep(wait_time)
+                        continue
+                    
+                    response.raise_for_status()
+                    logger.debug(f"Content-Encoding for {url}: {response.headers.get('Content-Encoding', 'identity')}")
+                    
+                    # Read the body in chunks so an oversized page is rejected
+                    # before it is fully buffered
+                    chunks = []
+                    total = 0
+                    for chunk in response.iter_content(self.PAGE_CHUNK_SIZE):
+                        total += len(chunk)
+                        if total > self.MAX_PAGE_BYTES:
+                            raise PageTooLargeError(f"{url} exceeds {self.MAX_PAGE_BYTES} bytes")
+                        chunks.append(chunk)
+                    html_content = b''.join(chunks).decode(response.encoding or 'utf-8', errors='replace')
                 
                 # Save to cache if we have a cache directory
                 if hasattr(self, 'cache_dir'):
-                    try:
-                        with open(cache_file, 'w', encoding='utf-8') as f:
-                            f.write(html_content)
-                    except Exception as e:
-                        logger.warning(f"Failed to write to cache: {e}")
+                    self._write_cache(cache_file, html_content.encode('utf-8'))
                 
                 return html_content
                 
+            except PageTooLargeError as e:
+                # Retrying would download the same oversized page again
+                logger.error(f"Skipping web page: {e}")
+                raise
             except requests.exceptions.HTTPError as e:
                 if response.status_code == 429 and attempt < self.MAX_RETRIES - 1:
                     continue  # Retry for rate limiting
@@ -239,17 +425,26 @@ class ECFRScraper:
         
         return titles
     
+    @cached_property
+    def _titles_by_number(self) -> Dict[int, Dict[str, Any]]:
+        """Titles from the API keyed by number; the first entry wins on duplicates."""
+        titles = {}
+        for title_data in self.fetch_api("titles").get('titles', []):
+            titles.setdefault(title_data.get('number'), title_data)
+        return titles
+    
     def get_title_structure(self, title_number: int) -> List[Dict[str, Any]]:
         """Get the structure of a title."""
         url = f"{self.BASE_URL}/current/title-{title_number}"
         html_content = self.fetch_web_page(url)
         
-        soup = BeautifulSoup(html_content, 'html.parser')
+        soup = BeautifulSoup(html_content, 'lxml', parse_only=_MAIN_STRAINER)
         structure = []
         
-        # Find main content area
+        # Find main content area, parsing the whole page only if it is missing
         main_content = soup.find('main', id='main-content')
         if not main_content:
+            soup = BeautifulSoup(html_content, 'lxml')
             main_content = soup.find('div', class_='main-content')
         if not main_content:
             main_content = soup.body
@@ -273,121 +468,73 @@ class ECFRScraper:
             break
         
         # Look for tables - they often contain the primary structure
-        tables = main_content.find_all('table')
-        for table in tables:
-            for link in table.find_all('a', href=True):
-                href = link['href']
-                text = link.get_text(strip=True)
-                
-                # Skip empty or non-content links
-                if not text or '#' in href or 'javascript' in href:
-                    continue
-                
-                # Complete the URL if it's a relative path
-                if not href.startswith('http'):
-                    href = self.BASE_URL + href if href.startswith('/') else f"{self.BASE_URL}/{href}"
-                
-                # Create a unique identifier
-                identifier = f"title-{title_number}-{href.split('/')[-1]}"
-                
-                item = {
-                    'identifier': identifier,
-                    'title': text,
-                    'html_url': href,
-                    'children': []
-                }
-                
-                # Add agency if found
-                if agency_info:
-                    item['agency'] = agency_info
-                
-                structure.append(item)
+        table_links = (link for table in main_content.find_all('table') for link in table.find_all('a', href=True))
+        structure = list(self._link_items(table_links, title_number, agency_info))
         
         # If no tables or no links found in tables, look for links in divs
         if not structure:
             # Find divs that might contain structure (try various class patterns)
             potential_containers = main_content.find_all(['div', 'ul', 'ol'], 
                 class_=lambda c: c and any(term in str(c).lower() for term in ['browse', 'toc', 'content', 'nav', 'menu']))
-            
-            for container in potential_containers:
-                for link in container.find_all('a', href=True):
-                    href = link['href']
-                    text = link.get_text(strip=True)
-                    
-                    # Skip empty or non-content links
-                    if not text or '#' in href or 'javascript' in href:
-                        continue
-                    
-                    # Complete the URL if it's a relative path
-                    if not href.startswith('http'):
-                        href = self.BASE_URL + href if href.startswith('/') else f"{self.BASE_URL}/{href}"
-                    
-                    # Create a unique identifier
-                    identifier = f"title-{title_number}-{href.split('/')[-1]}"
-                    
-                    item = {
-                        'identifier': identifier,
-                        'title': text,
-                        'html_url': href,
-                        'children': []
-                    }
-                    
-                    # Add agency if found
-                    if agency_info:
-                        item['agency'] = agency_info
-                    
-                    structure.append(item)
+            container_links = (link for container in potential_containers for link in container.find_all('a', href=True))
+            structure = list(self._link_items(container_links, title_number, agency_info))
         
-        # If still no structure, grab all links from main content
+        # If still no structure, grab all links from main content,
+        # skipping links to other titles or the homepage
         if not structure:
-            for link in main_content.find_all('a', href=True):
-                href = link['href']
-                text = link.get_text(strip=True)
-                
-                # Skip empty or non-content links
-                if not text or '#' in href or 'javascript' in href:
-                    continue
-                
-                # Skip links to other titles or the homepage
-                if any(term in href.lower() for term in ['/title-', 'index.html', 'home']):
-                    continue
-                
-                # Complete the URL if it's a relative path
-                if not href.startswith('http'):
-                    href = self.BASE_URL + href if href.startswith('/') else f"{self.BASE_URL}/{href}"
-                
-                # Create a unique identifier
-                identifier = f"title-{title_number}-{href.split('/')[-1]}"
-                
-                item = {
-                    'identifier': identifier,
-                    'title': text,
-                    'html_url': href,
-                    'children': []
-                }
-                
-                # Add agency if found
-                if agency_info:
-                    item['agency'] = agency_info
-                
-                structure.append(item)
+            structure = list(self._link_items(main_content.find_all('a', href=True), title_number, agency_info,
+                                              skip_terms=('/title-', 'index.html', 'home')))
         
         return structure
     
+    def _link_items(self, links: Iterable[Tag], title_number: int, agency_info: Optional[str],
+                    skip_terms: Tuple[str, ...] = ()) -> Iterator[Dict[str, Any]]:
+        """Yield structure items for content links, completing relative URLs."""
+        for link in links:
+            href = link['href']
+            text = link.get_text(strip=True)
+            
+            # Skip empty or non-content links
+            if not text or '#' in href or 'javascript' in href:
+                continue
+            if skip_terms and any(term in href.lower() for term in skip_terms):
+                continue
+            
+            # Complete the URL if it's a relative path
+            if not href.startswith('http'):
+                href = self.BASE_URL + href if href.startswith('/') else f"{self.BASE_URL}/{href}"
+            
+            item = {
+                # Create a unique identifier
+                'identifier': f"title-{title_number}-{href.split('/')[-1]}",
+                'title': text,
+                'html_url': href,
+                'children': []
+            }
+            
+            # Add agency if found
+            if agency_info:
+                item['agency'] = agency_info
+            
+            yield item
+    
     def get_section_content(self, url: str, identifier: str) -> Dict[str, Any]:
         """Scrape content from a given URL."""
         try:
             html_content = self.fetch_web_page(url)
-            soup = BeautifulSoup(html_content, 'html.parser')
+            # Headings are kept too, since the title may sit outside <main>
+            soup = BeautifulSoup(html_content, 'lxml', parse_only=_SECTION_STRAINER)
             
-            # Find main content
+            # Find main content, parsing the whole page only if it is missing
             main_content = soup.find('main', id='main-content')
             if not main_content:
-                main_content = soup.find('div', class_='main-content')
-            if not main_content:
-                main_content = soup.find('div', id=lambda i: i and ('content' in i.lower()))
-            if not main_content:
-                main_content = soup.find('div', class_=lambda c: c and ('content' in c.lower()))
+                soup = BeautifulSoup(html_content, 'lxml')
+                main_content = _first_match(
+                    _iter_tags(soup, ('div',)),
+                    lambda tag: 'main-content' in tag.get('class', ()),
+                    lambda tag: _attr_contains(tag, 'id', ('content',)),
+                    lambda tag: _attr_contains(tag, 'class', ('content',)),
+                )
             if not main_content:
                 main_content = soup.body
             
@@ -406,13 +553,13 @@ class ECFRScraper:
             
             # Get title
             title = ""
-            # Try to find title in h1/h2 elements first
-            title_elem = soup.find(['h1', 'h2'], id=lambda i: i and ('title' in i.lower() or 'heading' in i.lower()))
-            if not title_elem:
-                title_elem = soup.find(['h1', 'h2'], class_=lambda c: c and ('title' in c.lower() or 'heading' in c.lower()))
-            if not title_elem:
-                # Just take the first h1 or h2
-                title_elem = soup.find(['h1', 'h2'])
+            # Prefer an h1/h2 marked as a title or heading, else the first one
+            title_elem = _first_match(
+                _iter_tags(soup, ('h1', 'h2')),
+                lambda tag: _attr_contains(tag, 'id', ('title', 'heading')),
+                lambda tag: _attr_contains(tag, 'class', ('title', 'heading')),
+                lambda tag: True,
+            )
             
             if title_elem:
                 title = title_elem.get_text(strip=True)
@@ -421,10 +568,10 @@ class ECFRScraper:
                 title = url.split('/')[-1].replace('-', ' ').title()
             
             # Clean up the title
-            title = re.sub(r'\s+', ' ', title).strip()
+            title = _RE_WS.sub(' ', title).strip()
             
-            # Extract text content
-            text_content = self.extract_plain_text(str(main_content))
+            # Extract text content straight from the parsed tree
+            text_content = self.extract_plain_text(main_content)
             
             return {
                 'identifier': identifier,
@@ -444,73 +591,107 @@ class ECFRScraper:
                 'error': str(e)
             }
     
-    def clean_html_content(self, html_content: str) -> str:
-        """Clean HTML content and convert to markdown."""
+    def clean_html_content(self, html_content: str, use_markdown: bool = True) -> str:
+        """Clean HTML content and convert to markdown, or to plain paragraphs if use_markdown is False."""
         if not html_content:
             return ""
         
         # Clean up common issues
-        html_content = re.sub(r'<!\-\-.*?\-\->', '', html_content, flags=re.DOTALL)  # Remove comments
-        html_content = re.sub(r'\s+', ' ', html_content)  # Normalize whitespace
-        html_content = re.sub(r'<br\s*/?>', '\n', html_content)  # Convert <br> to newlines
+        html_content = _RE_COMMENT.sub('', html_content)  # Remove comments
+        html_content = _RE_WS.sub(' ', html_content)  # Normalize whitespace
+        html_content = _RE_BR.sub('\n', html_content)  # Convert <br> to newlines
         
         # Replace div with heading classes to actual headings
-        for i in range(1, 7):
-            html_content = re.sub(f'<div[^>]*?class=["\']h{i}["\'][^>]*?>(.*?)</div>', f'<h{i}>\\1</h{i}>', html_content)
+        for pattern, heading in _RE_DIV_H:
+            html_content = pattern.sub(heading, html_content)
         
         # Convert to markdown
-        try:
-            from html2text import HTML2Text
+        if use_markdown and HTML2Text is not None:
             h2t = HTML2Text()
             h2t.body_width = 0  # No wrapping
             h2t.inline_links = True
             h2t.unicode_snob = True
             md_content = h2t.handle(html_content)
-        except ImportError:
-            # Fallback to basic conversion
-            soup = BeautifulSoup(html_content, 'html.parser')
+        else:
+            # Basic conversion on lxml's C parser
+            soup = BeautifulSoup(html_content, 'lxml')
             md_content = soup.get_text(separator='\n\n', strip=True)
         
         # Clean up markdown
-        md_content = re.sub(r'\n{3,}', '\n\n', md_content)  # Remove excess newlines
-        md_content = re.sub(r'!?\[\]\((?:javascript|data):.*?\)', '', md_content)  # Remove problematic links
+        md_content = _RE_NL3.sub('\n\n', md_content)  # Remove excess newlines
+        md_content = _RE_BAD_LINK.sub('', md_content)  # Remove problematic links
         
         return md_content.strip()
     
-    def extract_plain_text(self, html_content: str) -> str:
-        """Extract plain text from HTML content."""
-        if not html_content:
+    def extract_plain_text(self, html_content: Union[str, Tag]) -> str:
+        """Extract plain text from HTML content or an already parsed Tag."""
+        if isinstance(html_content, Tag):
+            soup = html_content
+        elif not html_content:
             return ""
-        
-        soup = BeautifulSoup(html_content, 'html.parser')
+        else:
+            soup = BeautifulSoup(html_content, 'lxml')
         
         # Get text
         text = soup.get_text(separator=' ', strip=True)
         
         # Clean up the text
-        text = re.sub(r'\s+', ' ', text)  # Normalize whitespace
-        text = re.sub(r'(\. )', '.\n', text)  # Add newlines after periods
+        text = _RE_WS.sub(' ', text)  # Normalize whitespace
+        text = _RE_SENTENCE_END.sub('.\n', text)  # Add newlines after periods
         
         return text.strip()
     
     def create_safe_filename(self, text: str, max_length: int = 100) -> str:
         """Create a safe filename from text."""
         # Remove non-alphanumeric characters
-        safe_text = re.sub(r'[^\w\s-]', '', text)
+        safe_text = _RE_SAFE.sub('', text)
         # Replace whitespace with underscores
-        safe_text = re.sub(r'[\s-]+', '_', safe_text).strip('_')
+        safe_text = _RE_WS_DASH.sub('_', safe_text).strip('_')
         # Truncate to max length
         if len(safe_text) > max_length:
             safe_text = safe_text[:max_length]
         
         return safe_text
     
+    def _render_both(self, html_content: str, text_content: Optional[str] = None) -> Tuple[str, str]:
+        """Return (markdown, plain text) for html_content, rendering each at most once."""
+        key = hashlib.blake2b(html_content.encode('utf-8'), digest_size=8).digest()
+        cached = self._render_cache.get(key)
+        if cached is not None:
+            self._render_cache.move_to_end(key)
+            return cached
+        
+        if text_content is None:
+            text_content = self.extract_plain_text(html_content)
+        rendered = (self.clean_html_content(html_content, self.formatted == 'markdown'), text_content)
+        
+        self._render_cache[key] = rendered
+        if len(self._render_cache) > self.RENDER_CACHE_SIZE:
+            self._render_cache.popitem(last=False)
+        return rendered
+    
+    def _ensure_dir(self, path: str) -> None:
+        """Create a directory unless this scraper has already created it."""
+        if path not in self._created_dirs:
+            os.makedirs(path, exist_ok=True)
+            self._created_dirs.add(path)
+    
     def save_document(self, title: str, identifier: str, html_content: str, url: str, 
-                    path_prefix: str = "", hierarchy: List[str] = None) -> str:
-        """Save a document's content to files with proper directory structure."""
+                    path_prefix: str = "", hierarchy: List[str] = None,
+                    text_content: Optional[str] = None) -> str:
+        """Save a document's content to files with proper directory structure.
+        
+        Pass text_content when the plain text has already been extracted, to
+        avoid parsing html_content a second time. When the scraper's
+        formatted mode is 'none' only the plain text file is written.
+        """
+        emit_formatted = self.formatted != 'none'
+        
         # Generate formatted and plain content
-        formatted_content = self.clean_html_content(html_content)
-        plain_content = self.extract_plain_text(html_content)
+        if emit_formatted:
+            formatted_content, plain_content = self._render_both(html_content, text_content)
+        else:
+            plain_content = text_content if text_content is not None else self.extract_plain_text(html_content)
         
         # Create a safe filename
         safe_title = self.create_safe_filename(title)
@@ -534,8 +715,9 @@ class ECFRScraper:
             formatted_subdir = os.path.join(self.formatted_dir, title_dir)
             plain_subdir = os.path.join(self.plain_dir, title_dir)
             
-            os.makedirs(formatted_subdir, exist_ok=True)
-            os.makedirs(plain_subdir, exist_ok=True)
+            if emit_formatted:
+                self._ensure_dir(formatted_subdir)
+            self._ensure_dir(plain_subdir)
         else:
             formatted_subdir = self.formatted_dir
             plain_subdir = self.plain_dir
@@ -545,20 +727,21 @@ class ECFRScraper:
                 safe_title = f"{path_prefix}_{safe_title}"
         
         # Save formatted version
-        formatted_path = os.path.join(formatted_subdir, f"{safe_title}.md")
-        with open(formatted_path, 'w', encoding='utf-8') as f:
-            f.write(f"# {title}\n\n")
-            f.write(f"Source: {url}\n")
-            f.write(f"Identifier: {identifier}\n\n")
+        if emit_formatted:
+            formatted_path = os.path.join(formatted_subdir, f"{safe_title}.md")
+            parts = [f"# {title}\n\n", f"Source: {url}\n", f"Identifier: {identifier}\n\n"]
             
             # Add hierarchy information
             if hierarchy:
-                f.write("## Hierarchy\n\n")
-                for i, level in enumerate(hierarchy):
-                    f.write(f"{'  ' * i}* {level}\n")
-                f.write("\n")
-                
-            f.write(formatted_content)
+                parts.append("## Hierarchy\n\n")
+                parts.extend(f"{'  ' * i}* {level}\n" for i, level in enumerate(hierarchy))
+                parts.append("\n")
+            
+            parts.append(formatted_content)
+            
+            # Build the whole file first so it goes out in a single write
+            with open(formatted_path, 'w', encoding='utf-8') as f:
+                f.write(''.join(parts))
         
         # Save plain version
         plain_path = os.path.join(plain_subdir, f"{safe_title}.txt")
@@ -566,7 +749,10 @@ class ECFRScraper:
             f.write(plain_content)
         
         # Create a relative path for logging
-        rel_path = os.path.relpath(formatted_path, self.formatted_dir)
+        if emit_formatted:
+            rel_path = os.path.relpath(formatted_path, self.formatted_dir)
+        else:
+            rel_path = os.path.relpath(plain_path, self.plain_dir)
         logger.info(f"Saved document: {rel_path}")
         
         return safe_title
@@ -574,23 +760,18 @@ class ECFRScraper:
     def process_title(self, title_number: int) -> Dict[str, Any]:
         """Process a title and return the data."""
         try:
-            # Get the titles list from API
-            data = self.fetch_api("titles")
-            
-            # Find the specific title
+            # Find the specific title in the titles list from the API
             title_obj = None
-            if 'titles' in data:
-                for title_data in data['titles']:
-                    if title_data.get('number') == title_number:
-                        title_obj = ECFRTitle(
-                            number=title_data.get('number'),
-                            name=title_data.get('name'),
-                            reserved=title_data.get('reserved', False),
-                            up_to_date_as_of=title_data.get('up_to_date_as_of'),
-                            latest_amended_on=title_data.get('latest_amended_on'),
-                            latest_issue_date=title_data.get('latest_issue_date')
-                        )
-                        break
+            title_data = self._titles_by_number.get(title_number)
+            if title_data is not None:
+                title_obj = ECFRTitle(
+                    number=title_data.get('number'),
+                    name=title_data.get('name'),
+                    reserved=title_data.get('reserved', False),
+                    up_to_date_as_of=title_data.get('up_to_date_as_of'),
+                    latest_amended_on=title_data.get('latest_amended_on'),
+                    latest_issue_date=title_data.get('latest_issue_date')
+                )
             
             if not title_obj:
                 logger.error(f"Title {title_number} not found")
@@ -612,42 +793,75 @@ class ECFRScraper:
                     identifier=f"title-{title_number}",
                     html_content=title_content.get('html_content', ''),
                     url=title_url,
-                    hierarchy=[f"Title {title_number}: {title_obj.name}"]
+                    hierarchy=[f"Title {title_number}: {title_obj.name}"],
+                    text_content=title_content.get('text_content')
                 )
             
-            # Process each section in the structure
+            # Fetch section pages in parallel; fetching is network-bound.
+            # Results are consumed in structure order and saved on this thread.
+            items = [
+                item for item in structure
+                if item.get('identifier') and item.get('html_url')
+            ]
+            
+            # The structure can list the same page more than once; fetch and
+            # parse each URL once and share the result between its items.
+            # Index of the last item using each URL, after which it is dropped.
+            last_use = {item['html_url']: i for i, item in enumerate(items)}
+            duplicates = len(items) - len(last_use)
+            if duplicates:
+                logger.info(f"Skipping {duplicates} duplicate page fetches for title {title_number}")
+            
+            # Only a window of pages is fetched ahead of the one being saved,
+            # so a title's pages are never all held in memory at once
+            window = 2 * self.max_workers
+            
             sections = []
-            for item in structure:
-                item_identifier = item.get('identifier')
-                item_title = item.get('title', '')
-                item_url = item.get('html_url', '')
-                
-                if not item_identifier or not item_url:
-                    continue
-                
-                # Get section content
-                section_content = self.get_section_content(item_url, item_identifier)
-                
-                # Skip if no content was found
-                if not section_content or not section_content.get('html_content'):
-                    continue
+            with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                futures = {}
+                next_index = 0
                 
-                # Save the document
-                self.save_document(
-                    title=item_title,
-                    identifier=item_identifier,
-                    html_content=section_content.get('html_content', ''),
-                    url=item_url,
-                    hierarchy=[f"Title {title_number}: {title_obj.name}", item_title]
-                )
-                
-                # Add to sections
-                sections.append({
-                    'identifier': item_identifier,
-                    'title': item_title,
-                    'url': item_url,
-                    'text_content': section_content.get('text_content', '')
-                })
+                for i, item in enumerate(items):
+                    while next_index < len(items) and (next_index <= i or len(futures) < window):
+                        ahead = items[next_index]
+                        if ahead['html_url'] not in futures:
+                            futures[ahead['html_url']] = executor.submit(
+                                self.get_section_content, ahead['html_url'], ahead['identifier']
+                            )
+                        next_index += 1
+                    
+                    if i == last_use[item['html_url']]:
+                        future = futures.pop(item['html_url'])
+                    else:
+                        future = futures[item['html_url']]
+                    item_identifier = item['identifier']
+                    item_title = item.get('title', '')
+                    item_url = item['html_url']
+                    
+                    # Get section content
+                    section_content = future.result()
+                    
+                    # Skip if no content was found
+                    if not section_content or not section_content.get('html_content'):
+                        continue
+                    
+                    # Save the document
+                    self.save_document(
+                        title=item_title,
+                        identifier=item_identifier,
+                        html_content=section_content.get('html_content', ''),
+                        url=item_url,
+                        hierarchy=[f"Title {title_number}: {title_obj.name}", item_title],
+                        text_content=section_content.get('text_content')
+                    )
+                    
+                    # Add to sections
+                    sections.append({
+                        'identifier': item_identifier,
+                        'title': item_title,
+                        'url': item_url,
+                        'text_content': section_content.get('text_content', '')
+                    })
             
             # Return success data
             return {
@@ -667,23 +881,42 @@ class ECFRScraper:
             logger.error(f"Error processing title {title_number}: {e}")
             return {"success": False, "error": str(e)}
 
-def scrape_title(title_number: int, output_dir: str = "./data") -> Dict[str, Any]:
+def scrape_title(title_number: int, output_dir: str = "./data", formatted: str = 'markdown') -> Dict[str, Any]:
     """Scrape a single title and return the data."""
-    scraper = ECFRScraper(output_dir)
+    scraper = ECFRScraper(output_dir, formatted=formatted)
     return scraper.process_title(title_number)
 
-if __name__ == "__main__":
+def scrape_titles(title_numbers: List[int], output_dir: str = "./data",
+                  formatted: str = 'markdown') -> Dict[int, Dict[str, Any]]:
+    """Scrape several titles with one scraper, sharing its session and API cache."""
+    scraper = ECFRScraper(output_dir, formatted=formatted)
+    return {title_number: scraper.process_title(title_number) for title_number in title_numbers}
+
+def main() -> int:
+    """Command-line entry point: scrape one or more titles."""
     import argparse
     
     parser = argparse.ArgumentParser(description="Scrape a title from the eCFR")
-    parser.add_argument("title_number", type=int, help="The title number to scrape")
+    parser.add_argument("title_numbers", type=int, nargs="+", help="The title number(s) to scrape")
     parser.add_argument("--output-dir", type=str, default="./data", help="Output directory")
+    parser.add_argument("--formatted", choices=FORMATTED_MODES, default='markdown',
+                        help="How to write the formatted files: markdown, plain paragraphs (text, faster) "
+                             "or not at all (none, fastest; 'process' needs the formatted files)")
     
     args = parser.parse_args()
     
-    result = scrape_title(args.title_number, args.output_dir)
+    results = scrape_titles(args.title_numbers, args.output_dir, formatted=args.formatted)
     
-    if result.get("success", False):
-        print(f"Successfully scraped Title {args.title_number} with {result.get('sections_count', 0)} sections")
-    else:
-        print(f"Failed to scrape Title {args.title_number}: {result.get('error')}")
\ No newline at end of file
+    failed = 0
+    for title_number, result in results.items():
+        if result.get("success", False):
+            print(f"Successfully scraped Title {title_number} with {result.get('sections_count', 0)} sections")
+        else:
+            failed += 1
+            print(f"Failed to scrape Title {title_number}: {result.get('error')}")
+    
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    import sys
+    sys.exit(main())
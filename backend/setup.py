@@ -1,14 +1,28 @@
 #!/usr/bin/env python3
 
-from setuptools import setup, find_packages
+from setuptools import setup
 import os
+import sys
 
-# Read README from the parent directory
-with open(os.path.join(os.path.dirname(__file__), '..', 'README.md'), 'r', encoding='utf-8') as f:
-    long_description = f.read()
+HERE = os.path.dirname(os.path.abspath(__file__))
 
-with open('requirements.txt', 'r', encoding='utf-8') as f:
-    requirements = f.read().splitlines()
+def _read(*parts: str) -> str:
+    """Read a text file relative to this directory."""
+    with open(os.path.join(HERE, *parts), 'r', encoding='utf-8') as f:
+        return f.read()
+
+# Informational queries such as `setup.py --version` run no command and
+# don't need the long description, so skip reading the README for them
+_commands = [arg for arg in sys.argv[1:] if not arg.startswith('-')]
+long_description = _read('..', 'README.md') if _commands else ""
+
+# Keep only requirement specifiers: drop blank lines, comments (including
+# trailing ones) and pip options such as -r or --index-url
+requirements = [
+    spec for spec in (line.split('#', 1)[0].strip()
+                      for line in _read('requirements.txt').splitlines())
+    if spec and not spec.startswith('-')
+]
 
 setup(
     name="ecfr-analyzer",
@@ -18,7 +32,15 @@ setup(
     long_description=long_description,
     long_description_content_type="text/markdown",
     url="https://github.com/username/ecfr",
-    packages=find_packages(),
+    # Listed explicitly so builds don't walk data/ and its caches
+    packages=[
+        "api",
+        "api.endpoints",
+        "models",
+        "processors",
+        "processors.bulk",
+        "utils",
+    ],
     classifiers=[
         "Programming Language :: Python :: 3",
         "License :: OSI Approved :: MIT License",
@@ -28,15 +50,11 @@ setup(
     install_requires=requirements,
     entry_points={
         'console_scripts': [
+            'ecfr=backend.cli:main',                  # Dispatcher: ecfr <analyzer|bulk|seed|scrape>
             'ecfr-analyzer=backend.main:main',        # Main command for the analyzer
             'ecfr-bulk=backend.processors.bulk_process:main',  # Bulk processing command
             'ecfr-seed=backend.processors.bulk_to_db:main',  # Database seeding command
             'ecfr-scrape=backend.processors.scraper:main',  # Web scraper command
         ],
     },
-    scripts=[
-        'bin/ecfr-bulk',
-        'bin/ecfr-seed',
-        'bin/ecfr-scrape',
-    ],
 )
\ No newline at end of file
@@ -1,18 +1,95 @@
 #!/usr/bin/env python3
 
+import math
 import os
-from pydantic_settings import BaseSettings
-from typing import Optional
+from dataclasses import dataclass, fields
+from typing import Any, Dict, Optional
 import logging
+from logging.handlers import MemoryHandler
 
-# Setup logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
 logger = logging.getLogger('config')
 
-class Settings(BaseSettings):
+# This module's startup lines are held in memory and written on the first
+# warning or at interpreter exit (logging.shutdown flushes the buffer), so
+# loading settings does no stderr writes in the common case
+_stderr_handler = logging.StreamHandler()
+_stderr_handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+logger.addHandler(MemoryHandler(capacity=100, flushLevel=logging.WARNING, target=_stderr_handler))
+logger.propagate = False
+
+ENV_FILE = ".env"
+
+_TRUE_VALUES = {'1', 'true', 't', 'yes', 'y', 'on'}
+_FALSE_VALUES = {'0', 'false', 'f', 'no', 'n', 'off'}
+
+def _read_env_file(path: str) -> Dict[str, str]:
+    """Parse KEY=VALUE lines from a .env file, ignoring blanks and comments."""
+    values = {}
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            lines = f.read().splitlines()
+    except FileNotFoundError:
+        return values
+    
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        if line.startswith('export '):
+            line = line[len('export '):].lstrip()
+        key, sep, value = line.partition('=')
+        if not sep:
+            continue
+        value = value.strip()
+        if len(value) >= 2 and value[0] == value[-1] and value[0] in ('"', "'"):
+            value = value[1:-1]
+        elif ' #' in value:
+            value = value.split(' #', 1)[0].rstrip()
+        values[key.strip()] = value
+    return values
+
+# Upper bound for automatically sized worker pools
+MAX_AUTO_WORKERS = 32
+
+def available_cpus() -> int:
+    """Return the CPUs this process may use, honouring affinity and cgroup v2 quotas."""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:  # Not available on macOS/Windows
+        cpus = os.cpu_count() or 1
+    
+    # A container's CPU quota, e.g. "200000 100000" for two CPUs or "max"
+    try:
+        with open('/sys/fs/cgroup/cpu.max', 'r') as f:
+            quota, period = f.read().split()
+        if quota != 'max':
+            cpus = min(cpus, max(1, math.ceil(int(quota) / int(period))))
+    except (OSError, ValueError):
+        pass
+    return cpus
+
+def default_workers() -> int:
+    """Return a worker count sized to the available CPUs."""
+    return min(MAX_AUTO_WORKERS, available_cpus())
+
+def _cast(field_type: Any, name: str, value: str) -> Any:
+    """Convert a raw environment string to a settings field's type."""
+    if field_type is bool:
+        lowered = value.strip().lower()
+        if lowered in _TRUE_VALUES:
+            return True
+        if lowered in _FALSE_VALUES:
+            return False
+        raise ValueError(f"Invalid boolean for {name}: {value!r}")
+    if field_type in (int, float):
+        try:
+            return field_type(value)
+        except ValueError:
+            raise ValueError(f"Invalid {field_type.__name__} for {name}: {value!r}") from None
+    return value
+
+@dataclass(frozen=True)
+class Settings:
     """Application settings loaded from environment variables or .env file."""
     
     # API configuration
@@ -35,26 +112,52 @@ class Settings(BaseSettings):
     USE_CACHE: bool = True
     
     # Processing options
-    MAX_WORKERS: int = 4  # parallel workers for processing
+    MAX_WORKERS: int = 0  # parallel workers for processing; 0 sizes to the available CPUs
     PROCESS_METRICS: bool = True  # calculate metrics during processing
     
     # NLP options
     NLTK_DATA_PATH: Optional[str] = None
     SPACY_MODEL: str = "en_core_web_sm"
     
-    class Config:
-        env_file = ".env"
-        case_sensitive = True
-
-# Create global settings object
-settings = Settings()
+    def __post_init__(self):
+        if self.MAX_WORKERS == 0:
+            object.__setattr__(self, 'MAX_WORKERS', default_workers())
+    
+    @classmethod
+    def from_env(cls, env_file: str = ENV_FILE) -> "Settings":
+        """Build settings from the environment, then the .env file, then defaults.
+        
+        Variable names are case-sensitive and must match the field names.
+        """
+        file_values = _read_env_file(env_file)
+        values = {}
+        for f in fields(cls):
+            raw = os.environ.get(f.name, file_values.get(f.name))
+            if raw is not None:
+                values[f.name] = _cast(f.type, f.name, raw)
+        return cls(**values)
 
-# Ensure paths exist
-os.makedirs(os.path.dirname(settings.DATABASE_URL.replace('sqlite:///', '')), exist_ok=True)
-os.makedirs(settings.CACHE_DIR, exist_ok=True)
+def _init_settings() -> Settings:
+    """Create the global settings object and log its values."""
+    # Setup logging
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    
+    loaded = Settings.from_env()
+    
+    # Log settings values in one record, formatted only if INFO is enabled
+    if logger.isEnabledFor(logging.INFO):
+        logger.info("Using database at %s; eCFR API URL: %s; using cache: %s; parallelism: %d workers",
+                    loaded.DATABASE_URL, loaded.ECFR_API_URL, loaded.USE_CACHE, loaded.MAX_WORKERS)
+    return loaded
 
-# Log settings values
-logger.info(f"Using database at {settings.DATABASE_URL}")
-logger.info(f"eCFR API URL: {settings.ECFR_API_URL}")
-logger.info(f"Using cache: {settings.USE_CACHE}")
-logger.info(f"Parallelism: {settings.MAX_WORKERS} workers")
\ No newline at end of file
+# The global settings object is created on first access, so importing this
+# module (e.g. for --help) does no parsing, filesystem or logging work
+def __getattr__(name):
+    if name == 'settings':
+        value = _init_settings()
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
\ No newline at end of file